@@ -107,6 +107,7 @@ reset_image_name = 'restart.png'
 # Define constants for Feature Matching
 MIN_MATCH_COUNT = 10 
 orb = cv2.ORB_create(nfeatures=5000, scoreType=cv2.ORB_FAST_SCORE) 
+TEMPLATE_SCALES = np.linspace(1.0, 0.2, 5)
 
 templates = {}
 reset_template = None
@@ -118,6 +119,31 @@ def save_config():
         for img_config in images_config:
             f.write(f"{img_config['name']},{img_config['required']}\n")
 
+def build_template_pyramid(template_img):
+    """
+    Precomputes ORB keypoints and descriptors of a template at every scale in TEMPLATE_SCALES.
+    Scales that shrink the template below 20 px or leave too few descriptors are pruned here,
+    so the detection loop only ever matches against these stored descriptors.
+    Returns a dict: {'shape': (height, width), 'levels': [{'scale', 'pts', 'des'}, ...]}.
+    """
+    levels = []
+    for scale in TEMPLATE_SCALES:
+        # Skip scaling that is too small
+        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
+            continue
+
+        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        kp, des = orb.detectAndCompute(scaled_template, None)
+        if des is None or len(des) < MIN_MATCH_COUNT:
+            continue
+
+        levels.append({
+            'scale': float(scale),
+            'pts': np.float32([k.pt for k in kp]),
+            'des': des
+        })
+    return {'shape': template_img.shape[:2], 'levels': levels}
+
 def load_templates():
     """Loads and prepares all template images."""
     global templates, reset_template
@@ -128,7 +154,7 @@ def load_templates():
         if os.path.exists(full_path):
             template_img = cv2.imread(full_path, cv2.IMREAD_GRAYSCALE)
             if template_img is not None:
-                templates[img_config['name']] = template_img
+                templates[img_config['name']] = build_template_pyramid(template_img)
             else:
                 print(f"Error: Unable to read image file '{full_path}'")
         else:
@@ -136,38 +162,81 @@ def load_templates():
 
     reset_path = os.path.join(IMAGE_FOLDER, reset_image_name)
     if os.path.exists(reset_path):
-        reset_template = cv2.imread(reset_path, cv2.IMREAD_GRAYSCALE)
+        reset_img = cv2.imread(reset_path, cv2.IMREAD_GRAYSCALE)
+        reset_template = build_template_pyramid(reset_img) if reset_img is not None else None
     else:
         messagebox.showerror("ข้อผิดพลาด", f"ไม่พบไฟล์รูปภาพสำหรับรีเซ็ต '{reset_image_name}'")
 
 # --- Main function (updated) ---
-def count_image_on_screen_orb(template_img):
+capture_local = threading.local()  # One mss session and grayscale buffer per thread
+
+def get_capture_session():
+    """Returns this thread's long-lived mss session, creating it on first use."""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is None:
+        sct = mss.mss()
+        capture_local.sct = sct
+    return sct
+
+def close_capture_session():
+    """Closes this thread's mss session when its capture loop finishes."""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is not None:
+        sct.close()
+        capture_local.sct = None
+        capture_local.gray = None
+
+def grab_screen_gray():
     """
-    Captures a screenshot and counts how many times the template image is found
+    Captures the whole desktop and returns it as a grayscale image.
+    The raw BGRA bytes are viewed without copying and converted into a grayscale
+    buffer that is allocated once per thread and reused, so the returned image
+    is only valid until the next call on the same thread.
+    This beta always captures the whole virtual desktop (monitors[0]); the capture-region
+    setting only exists in UsumeTrackSaveFinal1.0V.
+    """
+    sct = get_capture_session()
+    screen_shot = sct.grab(sct.monitors[0])
+    bgra = np.frombuffer(screen_shot.raw, dtype=np.uint8).reshape(screen_shot.height, screen_shot.width, 4)
+    gray = getattr(capture_local, 'gray', None)
+    if gray is None or gray.shape != bgra.shape[:2]:
+        gray = np.empty(bgra.shape[:2], dtype=np.uint8)
+        capture_local.gray = gray
+    cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=gray)
+    return gray
+
+def capture_frame():
+    """
+    Captures one frame for a detection tick.
+    The ORB features of the frame are computed on first use and shared by every scale and template.
+    """
+    return {'gray': grab_screen_gray(), 'kp': None, 'des': None}
+
+def get_frame_features(frame):
+    """Returns (keypoints, descriptors) of the frame, computing them only once per frame."""
+    if frame['kp'] is None:
+        frame['kp'], frame['des'] = orb.detectAndCompute(frame['gray'], None)
+    return frame['kp'], frame['des']
+
+def count_image_on_screen_orb(template, frame=None):
+    """
+    Counts how many times a template (from build_template_pyramid) is found on the screen
     using ORB and Homography.
+    If frame (from capture_frame) is given it is matched against that frame, otherwise a new screenshot is taken.
     Returns a tuple: (count found, percentage accuracy).
     """
-    sct = mss.mss()
-    screen_shot = sct.grab(sct.monitors[0])
-    screen_np = np.array(screen_shot)
-    screen_gray = cv2.cvtColor(screen_np, cv2.COLOR_BGRA2GRAY)
+    if frame is None:
+        frame = capture_frame()
+    kp2, des2 = get_frame_features(frame)
+    if des2 is None or len(des2) < MIN_MATCH_COUNT:
+        return 0, 0
 
     found_count = 0
     best_accuracy = 0
 
-    for scale in np.linspace(1.0, 0.2, 5): 
-        # Skip scaling that is too small
-        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
-            continue
-            
-        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
-        
-        kp1, des1 = orb.detectAndCompute(scaled_template, None)
-        kp2, des2 = orb.detectAndCompute(screen_gray, None)
-        
-        if des1 is None or des2 is None or len(des1) < MIN_MATCH_COUNT or len(des2) < MIN_MATCH_COUNT:
-            continue
-            
+    for level in template['levels']:
+        pts1, des1 = level['pts'], level['des']
+
         bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
         matches = bf.match(des1, des2)
         matches = sorted(matches, key=lambda x: x.distance)
@@ -175,7 +244,7 @@ def count_image_on_screen_orb(template_img):
         good_matches = matches[:50]
         
         if len(good_matches) >= MIN_MATCH_COUNT:
-            src_pts = np.float32([ kp1[m.queryIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
+            src_pts = pts1[[m.queryIdx for m in good_matches]].reshape(-1, 1, 2)
             dst_pts = np.float32([ kp2[m.trainIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
             
             M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
@@ -205,8 +274,11 @@ def show_notification_message(card_name, accuracy_percent):
 def run_main_loop():
     """Main function that runs in a background thread."""
     while not stop_event.is_set():
+        # One frame per tick: the reset check and every card are matched against the same screenshot
+        frame = capture_frame()
+
         if reset_template is not None:
-            current_reset_found, _ = count_image_on_screen_orb(reset_template)
+            current_reset_found, _ = count_image_on_screen_orb(reset_template, frame)
             if current_reset_found > 0:
                 root.after(0, lambda: status_label.config(text=f"กำลังรีเซ็ต!", style="Error.TLabel"))
                 for img_config in images_config:
@@ -224,9 +296,9 @@ def run_main_loop():
                 img_config['required'] = 0
 
             if img_config['found'] < img_config['required']:
-                template_img = templates.get(img_config['name'])
-                if template_img is not None:
-                    current_found, accuracy = count_image_on_screen_orb(template_img)
+                template = templates.get(img_config['name'])
+                if template is not None:
+                    current_found, accuracy = count_image_on_screen_orb(template, frame)
                     
                     if current_found > 0:
                         current_time = time.time()
@@ -254,6 +326,7 @@ def run_main_loop():
         
         time.sleep(0.5)
     
+    close_capture_session()
     root.after(100, update_gui)
     root.after(100, update_status_after_stop)
 
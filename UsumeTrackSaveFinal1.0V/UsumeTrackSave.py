@@ -14,6 +14,12 @@ import shutil
 import winsound
 from pynput import mouse, keyboard
 import ast
+import hashlib
+import json
+import concurrent.futures
+import multiprocessing
+import queue
+from multiprocessing import shared_memory
 
 # --- ฟังก์ชันแก้ไขเส้นทางสำหรับ PyInstaller ---
 def resource_path(relative_path):
@@ -27,6 +33,18 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def data_path(relative_path):
+    """
+    Returns the path of a file the program writes and must keep between launches.
+    A onefile .exe unpacks into a temporary folder that is deleted on exit,
+    so when frozen these files live next to the executable instead.
+    """
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
 # --- Sound file path ---
 SOUND_FILE = resource_path("notification.wav")
 if not os.path.exists(SOUND_FILE):
@@ -43,12 +61,94 @@ is_accuracy_hidden = False
 card_stop_event = threading.Event()
 card_thread = None
 IMAGE_FOLDER = resource_path("image")
+DESCRIPTOR_CACHE_FOLDER = data_path("descriptor_cache")
+DESCRIPTOR_CACHE_VERSION = 3  # Bump when the cached arrays change
 reset_image_name = 'restart.png'
 MIN_MATCH_COUNT = 10
-orb = cv2.ORB_create(nfeatures=5000, scoreType=cv2.ORB_FAST_SCORE)
+ORB_NFEATURES = 5000
+detector_local = threading.local()  # ORB detectors per thread, cv2 detectors are not safe to share
+FEATURE_TILE_OVERLAP = 32    # Pixels a tile extends past its core, at least ORB's patch size
+FEATURE_TILE_MIN_SIZE = 320  # Smallest tile side; smaller images are extracted in one pass
+tile_executor = None         # Thread pool for tile-parallel ORB extraction, created on first use
+tile_executor_workers = 0    # Worker count of tile_executor, so it is rebuilt when feature_tiles changes
+tile_executor_lock = threading.Lock()
+TEMPLATE_SCALES = np.linspace(1.0, 0.2, 5)
 templates = {}
+template_cache = {}  # Descriptor cache key -> template pyramid, shared by every load_templates() call
 reset_template = None
+anchor_template = None  # Grayscale image of the result-screen anchor (see anchor_present)
 images_config = []
+HOT_REGION_HISTORY = 5      # Number of recent hit boxes remembered per template
+HOT_REGION_PADDING = 0.5    # Fraction of the hot box size searched around it
+HOT_REGION_MAX_MISSES = 3   # Hot-region misses before a full-frame search
+hot_regions = {}            # Template name -> {'boxes': recent hit boxes, 'misses': misses in a row}
+RATIO_TEST = 0.75           # Lowe's ratio test for k-NN matches
+MATCH_INDEX_CACHE_SIZE = 32
+match_index_cache = {}      # Template set -> combined descriptor index (see build_match_index)
+# k-NN time of the whole template index (2938 rows: the three bundled images) against one
+# 1920x1080 screen, one CPU core, OpenCV 4.14, index build included:
+#   screen descriptors (ORB nfeatures)   1000     2500     5000
+#   bf    (batchDistance, exact)         50 ms   117 ms   207 ms
+#   flann (LSH, approximate)             23 ms    33 ms    57 ms
+#   numpy (XOR + popcount, exact)       1.1 s    1.3 s    2.6 s
+# On hot-region crops (1000-1800 descriptors) flann is still about 2x faster than bf.
+# bf stays the default because it is exact; the Benchmark button measures the current machine.
+MATCHER_BACKENDS = {
+    'bf': "Brute-force (Hamming)",
+    'flann': "FLANN (LSH)",
+    'numpy': "NumPy (XOR + popcount, ช้า)"
+}
+FLANN_INDEX_LSH = 6
+FLANN_LSH_INDEX_PARAMS = dict(algorithm=FLANN_INDEX_LSH, table_number=6, key_size=12, multi_probe_level=1)
+FLANN_SEARCH_PARAMS = dict(checks=50)
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+NUMPY_MATCH_CHUNK_BYTES = 1 << 21  # Size of the XOR block per chunk of query rows, kept cache-sized
+CHANGE_THUMBNAIL_SIZE = (96, 54)  # (width, height) of the thumbnail used to detect screen changes
+CHANGE_GRID = (12, 6)             # (columns, rows) of thumbnail cells compared separately for the change gate
+CHANGE_THRESHOLD = 6.0            # Mean absolute difference (gray levels) in any one cell that counts as a change
+MOTION_THRESHOLD = 4.0            # Frame-to-frame thumbnail difference above which the screen is animating
+COARSE_FACTORS = {1: "เต็ม", 2: "1/2"}  # At 1/4 the bundled cards keep too few ORB features for any coarse level
+COARSE_CANDIDATE_PADDING = 0.5    # Fraction of a coarse candidate box added around it for verification
+PIPELINE_FRAME_BUFFERS = 3        # Frame buffers shared by the capture and detection stages
+PIPELINE_STATS_INTERVAL = 30.0    # Seconds between pipeline stage statistics printouts
+notification_queue = queue.Queue(maxsize=8)  # Sounds waiting for the notification stage
+notification_stats = {'count': 0, 'dropped': 0, 'busy': 0.0}  # Counters of the notification stage
+RESULT_RING_SLOTS = 8             # Detection ticks the worker process can publish ahead of the GUI
+PROCESS_POLL_INTERVAL = 0.05      # Seconds between result ring polls in the detector-process mode
+ANCHOR_THRESHOLD = 0.8            # Normalised cross-correlation score that counts as the anchor being present
+ANCHOR_ROI_PADDING = 0.5          # Fraction of the anchor size added around it when its ROI is learned
+CARD_COOLDOWN = 2.0               # Seconds after a card is counted before it can be counted again
+DEFAULT_TEMPLATE_COST = 0.05      # Seconds assumed for a template search before one is measured
+TEMPLATE_COST_SMOOTHING = 0.3     # Weight of the newest measurement in a template's running cost
+DETECTION_DEADLINE = 1.0          # Seconds a thread-pool tick waits for template searches
+SCALE_INFERENCE_LEVELS = 2        # Scale levels verified around the scale inferred from keypoint sizes
+GEOMETRY_MODELS = {
+    'similarity': "Similarity (RANSAC)",
+    'usac': "Similarity (USAC)",
+    'homography': "Homography"
+}
+PLAUSIBLE_CARD_SCALE = (0.1, 2.0)  # On-screen card scale (relative to the template image) a fit may have
+MAX_CARD_ROTATION = 10.0           # Degrees of rotation a similarity fit may have
+MAX_CARD_DISTORTION = 0.1          # Axis scale mismatch and shear (cosine) a full affine USAC fit may have
+
+# --- Detector settings (saved to settings.json) ---
+SETTINGS_FILE = data_path("settings.json")
+settings = {
+    'capture_region': None,  # {'left', 'top', 'width', 'height'} in desktop coordinates, None = whole desktop
+    'matcher': 'bf',         # Descriptor matcher backend, a key of MATCHER_BACKENDS
+    'stable_frames': 1,      # Calm frames in a row required before cards are matched (0 = never wait)
+    'coarse_factor': 1,      # Full-frame searches first run on a 1/N-scale frame (1 = full resolution only)
+    'scale_inference': True, # Verify only the scale levels nearest the scale inferred from keypoint sizes
+    'geometry': 'similarity', # Transform model used to verify matches, a key of GEOMETRY_MODELS
+    'detector_threads': 0,   # Templates searched in parallel on a thread pool (0 = one combined pass)
+    'feature_tiles': 0,      # Large frames are split into an N x N tile grid for parallel ORB (0/1 = off)
+    'detector_process': False, # Capture and detect in a worker process instead of a GUI-process thread
+    'capture_fps': 2.0,      # Frames per second the capture stage grabs
+    'tick_budget_ms': 0,     # Card matching time per tick on top of the shared feature extraction; the rest waits (0 = no limit)
+    'scale_memory': {},      # Template name -> on-screen scale of its last hit, where its next search starts
+    'anchor_image': None,    # File in IMAGE_FOLDER only seen on the result screen; cards are matched only while it is visible
+    'anchor_box': None       # [left, top, width, height] of the anchor search area in desktop coordinates, None = whole frame
+}
 
 # --- Macro Automation Global variables ---
 actions = []
@@ -132,17 +232,201 @@ def save_config():
             
             f.write(f"{img_config['name']},{required_value}\n")
 
+def load_settings():
+    """Loads detector settings from settings.json, keeping the defaults for missing keys."""
+    try:
+        with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        print(f"Failed to read settings: {e}")
+        return
+    for key in settings:
+        if key in saved:
+            settings[key] = saved[key]
+    if settings['coarse_factor'] not in COARSE_FACTORS:
+        settings['coarse_factor'] = 1
+
+def save_settings():
+    """Saves detector settings to settings.json."""
+    # scale_memory is updated by the detection threads, so a copy of it is written
+    snapshot = dict(settings, scale_memory=dict(settings['scale_memory']))
+    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
+
+def get_orb(nfeatures=ORB_NFEATURES):
+    """Returns this thread's ORB detector with the given feature budget, creating it on first use."""
+    detectors = getattr(detector_local, 'orbs', None)
+    if detectors is None:
+        detectors = {}
+        detector_local.orbs = detectors
+    if nfeatures not in detectors:
+        detectors[nfeatures] = cv2.ORB_create(nfeatures=nfeatures, scoreType=cv2.ORB_FAST_SCORE)
+    return detectors[nfeatures]
+
+def build_template_pyramid(template_img):
+    """
+    Precomputes ORB keypoints and descriptors of a template at every scale in TEMPLATE_SCALES,
+    plus the same scales divided by each coarse factor for the coarse stage of
+    locate_templates_coarse_to_fine (a card at on-screen scale s is s/factor on a 1/factor frame).
+    Returns a dict: {'shape': (height, width), 'levels': [{'scale', 'pts', 'sizes', 'des'}, ...],
+    'coarse': {factor: levels}}.
+    """
+    coarse = {factor: build_pyramid_levels(template_img, TEMPLATE_SCALES / factor) for factor in COARSE_FACTORS if factor > 1}
+    return {'shape': template_img.shape[:2], 'levels': build_pyramid_levels(template_img, TEMPLATE_SCALES), 'coarse': coarse}
+
+def build_pyramid_levels(template_img, scales):
+    """
+    Returns the pyramid levels of a template at the given scales. Scales that shrink the
+    template below 20 px or leave too few descriptors are pruned here, so the detection
+    loop only ever matches against these stored descriptors.
+    """
+    levels = []
+    for scale in scales:
+        # Skip scaling that is too small
+        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
+            continue
+
+        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        kp, des = get_orb().detectAndCompute(scaled_template, None)
+        if des is None or len(des) < MIN_MATCH_COUNT:
+            continue
+
+        levels.append({
+            'scale': float(scale),
+            'pts': np.float32([k.pt for k in kp]),
+            'sizes': np.float32([k.size for k in kp]),
+            'des': des
+        })
+    return levels
+
+def descriptor_cache_key(image_bytes):
+    """
+    Returns the descriptor cache key of an image file: the SHA-1 of its contents
+    plus every parameter that changes the computed features.
+    """
+    params = repr((DESCRIPTOR_CACHE_VERSION, ORB_NFEATURES, MIN_MATCH_COUNT, [round(float(s), 4) for s in TEMPLATE_SCALES], sorted(COARSE_FACTORS)))
+    return hashlib.sha1(image_bytes + params.encode("utf-8")).hexdigest()
+
+def write_descriptor_cache(cache_dir, template):
+    """Stores a template pyramid as plain .npy arrays so it can be memory-mapped on the next launch."""
+    tmp_dir = cache_dir + ".tmp"
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        np.save(os.path.join(tmp_dir, "shape.npy"), np.array(template['shape'], dtype=np.int64))
+        save_cached_levels(tmp_dir, "", template['levels'])
+        for factor, levels in template['coarse'].items():
+            save_cached_levels(tmp_dir, f"coarse{factor}_", levels)
+        os.replace(tmp_dir, cache_dir)
+    except OSError as e:
+        print(f"Failed to write descriptor cache '{cache_dir}': {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def save_cached_levels(cache_dir, prefix, levels):
+    """Stores one list of pyramid levels as concatenated arrays plus per-level offsets, file names starting with prefix."""
+    offsets = np.cumsum([0] + [len(level['des']) for level in levels]).astype(np.int64)
+    if levels:
+        pts = np.concatenate([level['pts'] for level in levels])
+        sizes = np.concatenate([level['sizes'] for level in levels])
+        des = np.concatenate([level['des'] for level in levels])
+    else:
+        pts = np.zeros((0, 2), dtype=np.float32)
+        sizes = np.zeros(0, dtype=np.float32)
+        des = np.zeros((0, 32), dtype=np.uint8)
+
+    np.save(os.path.join(cache_dir, prefix + "scales.npy"), np.array([level['scale'] for level in levels], dtype=np.float64))
+    np.save(os.path.join(cache_dir, prefix + "offsets.npy"), offsets)
+    np.save(os.path.join(cache_dir, prefix + "pts.npy"), pts)
+    np.save(os.path.join(cache_dir, prefix + "sizes.npy"), sizes)
+    np.save(os.path.join(cache_dir, prefix + "des.npy"), des)
+
+def read_descriptor_cache(cache_dir):
+    """Loads a template pyramid written by write_descriptor_cache, or returns None if it is missing or broken."""
+    if not os.path.isdir(cache_dir):
+        return None
+    try:
+        shape = np.load(os.path.join(cache_dir, "shape.npy"))
+        levels = load_cached_levels(cache_dir, "")
+        coarse = {factor: load_cached_levels(cache_dir, f"coarse{factor}_") for factor in COARSE_FACTORS if factor > 1}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring broken descriptor cache '{cache_dir}': {e}")
+        return None
+    return {'shape': (int(shape[0]), int(shape[1])), 'levels': levels, 'coarse': coarse}
+
+def load_cached_levels(cache_dir, prefix):
+    """Loads one list of pyramid levels written by save_cached_levels, memory-mapping the arrays."""
+    scales = np.load(os.path.join(cache_dir, prefix + "scales.npy"))
+    offsets = np.load(os.path.join(cache_dir, prefix + "offsets.npy"))
+    pts = np.load(os.path.join(cache_dir, prefix + "pts.npy"), mmap_mode='r')
+    sizes = np.load(os.path.join(cache_dir, prefix + "sizes.npy"), mmap_mode='r')
+    des = np.load(os.path.join(cache_dir, prefix + "des.npy"), mmap_mode='r')
+
+    levels = []
+    for i, scale in enumerate(scales):
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        levels.append({
+            'scale': float(scale),
+            'pts': np.asarray(pts[start:end]),
+            'sizes': np.asarray(sizes[start:end]),
+            'des': np.asarray(des[start:end])
+        })
+    return levels
+
+def load_template_cached(full_path):
+    """
+    Returns the template pyramid of an image file, computing ORB features only
+    for images that are new or changed since they were last cached.
+    Returns None if the image cannot be read.
+    """
+    with open(full_path, "rb") as f:
+        image_bytes = f.read()
+    key = descriptor_cache_key(image_bytes)
+    if key in template_cache:
+        return template_cache[key]
+
+    cache_dir = os.path.join(DESCRIPTOR_CACHE_FOLDER, key)
+    template = read_descriptor_cache(cache_dir)
+    if template is None:
+        template_img = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if template_img is None:
+            return None
+        template = build_template_pyramid(template_img)
+        write_descriptor_cache(cache_dir, template)
+
+    template['cache_key'] = key
+    template_cache[key] = template
+    return template
+
+def prune_descriptor_cache(used_keys):
+    """
+    Drops cached pyramids of images that were changed or removed: from template_cache
+    and, for entries named like a cache key, from DESCRIPTOR_CACHE_FOLDER.
+    """
+    for key in [key for key in template_cache if key not in used_keys]:
+        del template_cache[key]
+    try:
+        entries = os.listdir(DESCRIPTOR_CACHE_FOLDER)
+    except OSError:
+        return
+    for entry in entries:
+        key = entry[:-len(".tmp")] if entry.endswith(".tmp") else entry
+        if len(key) == 40 and all(c in "0123456789abcdef" for c in key) and entry not in used_keys:
+            shutil.rmtree(os.path.join(DESCRIPTOR_CACHE_FOLDER, entry), ignore_errors=True)
+
 def load_templates():
-    """Loads and prepares all template images."""
+    """Loads and prepares all template images, reusing cached descriptors for unchanged files and dropping those of changed ones."""
     global templates, reset_template
     templates.clear()
+    os.makedirs(DESCRIPTOR_CACHE_FOLDER, exist_ok=True)
     
     for img_config in images_config:
         full_path = os.path.join(IMAGE_FOLDER, img_config['name'])
         if os.path.exists(full_path):
-            template_img = cv2.imread(full_path, cv2.IMREAD_GRAYSCALE)
-            if template_img is not None:
-                templates[img_config['name']] = template_img
+            template = load_template_cached(full_path)
+            if template is not None:
+                templates[img_config['name']] = template
             else:
                 print(f"Error: Unable to read image file '{full_path}'")
         else:
@@ -150,58 +434,776 @@ def load_templates():
 
     reset_path = os.path.join(IMAGE_FOLDER, reset_image_name)
     if os.path.exists(reset_path):
-        reset_template = cv2.imread(reset_path, cv2.IMREAD_GRAYSCALE)
+        reset_template = load_template_cached(reset_path)
     else:
         messagebox.showerror("ข้อผิดพลาด", f"ไม่พบไฟล์รูปภาพสำหรับรีเซ็ต '{reset_image_name}'")
 
-def count_image_on_screen_orb(template_img):
+    used_templates = list(templates.values()) + ([reset_template] if reset_template is not None else [])
+    prune_descriptor_cache({template['cache_key'] for template in used_templates})
+
+    load_anchor_template()
+
+def load_anchor_template():
+    """Loads the anchor image named in settings (or clears it when none is set)."""
+    global anchor_template
+    anchor_template = None
+    if settings['anchor_image']:
+        anchor_path = os.path.join(IMAGE_FOLDER, settings['anchor_image'])
+        anchor_template = cv2.imread(anchor_path, cv2.IMREAD_GRAYSCALE)
+        if anchor_template is None:
+            print(f"Error: Unable to read anchor image '{anchor_path}'")
+
+def get_anchor_roi(frame):
+    """
+    Returns the anchor search area of a frame as (x0, y0, x1, y1) in frame pixels.
+    The stored box is in desktop coordinates, so it stays put when the capture region changes;
+    if it no longer fits an anchor inside the frame, the whole frame is searched instead.
+    """
+    height, width = frame['gray'].shape[:2]
+    box = settings['anchor_box']
+    if not box:
+        return 0, 0, width, height
+    x0, y0 = int(box[0] - frame['offset'][0]), int(box[1] - frame['offset'][1])
+    x0, y0, x1, y1 = max(x0, 0), max(y0, 0), min(x0 + int(box[2]), width), min(y0 + int(box[3]), height)
+    template_height, template_width = anchor_template.shape[:2]
+    if x1 - x0 < template_width or y1 - y0 < template_height:
+        return 0, 0, width, height
+    return x0, y0, x1, y1
+
+def match_anchor(frame, roi):
+    """
+    Matches the anchor image inside roi (x0, y0, x1, y1) of the frame with normalised
+    cross-correlation, like the restart.png check of newskipbeta.
+    Returns (score, (x, y) of the best match in frame pixels), or (0, None) if the ROI is too small.
+    """
+    x0, y0, x1, y1 = roi
+    template_height, template_width = anchor_template.shape[:2]
+    if x1 - x0 < template_width or y1 - y0 < template_height:
+        return 0, None
+    res = cv2.matchTemplate(frame['gray'][y0:y1, x0:x1], anchor_template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    return max_val, (max_loc[0] + x0, max_loc[1] + y0)
+
+def anchor_present(frame):
+    """
+    Returns True if the result-screen anchor is visible in its ROI, or if no anchor is configured.
+    This is a single normalised cross-correlation on a small area, so it is much cheaper than ORB.
+    """
+    if anchor_template is None:
+        return True
+    score, _ = match_anchor(frame, get_anchor_roi(frame))
+    return score >= ANCHOR_THRESHOLD
+
+capture_local = threading.local()  # One mss session and grayscale buffer per thread
+
+def get_capture_session():
+    """Returns this thread's long-lived mss session, creating it on first use."""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is None:
+        sct = mss.mss()
+        capture_local.sct = sct
+    return sct
+
+def close_capture_session():
+    """Closes this thread's mss session when its capture loop finishes."""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is not None:
+        sct.close()
+        capture_local.sct = None
+        capture_local.gray = None
+
+def clip_region_to_desktop(region, desktop):
+    """
+    Clips a capture region to the virtual desktop.
+    Returns None if the region is missing or lies completely off-screen.
+    """
+    if not region:
+        return None
+    left = max(int(region['left']), desktop['left'])
+    top = max(int(region['top']), desktop['top'])
+    right = min(int(region['left']) + int(region['width']), desktop['left'] + desktop['width'])
+    bottom = min(int(region['top']) + int(region['height']), desktop['top'] + desktop['height'])
+    if right - left < 20 or bottom - top < 20:
+        return None
+    return {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+
+def get_capture_monitor():
+    """Returns the area to capture: the configured capture region, or the whole desktop."""
+    desktop = get_capture_session().monitors[0]
+    return clip_region_to_desktop(settings['capture_region'], desktop) or desktop
+
+def grab_screen_gray(monitor=None, out=None):
+    """
+    Captures the given area (the whole desktop by default) and returns it as a grayscale image.
+    The raw BGRA bytes are viewed without copying and converted into a grayscale
+    buffer that is allocated once per thread and reused, so the returned image
+    is only valid until the next call on the same thread.
+    If out is given it is used as the buffer instead (a new one is allocated if its size does not fit).
+    """
+    sct = get_capture_session()
+    screen_shot = sct.grab(monitor or sct.monitors[0])
+    bgra = np.frombuffer(screen_shot.raw, dtype=np.uint8).reshape(screen_shot.height, screen_shot.width, 4)
+    gray = out if out is not None else getattr(capture_local, 'gray', None)
+    if gray is None or gray.shape != bgra.shape[:2]:
+        gray = np.empty(bgra.shape[:2], dtype=np.uint8)
+        if out is None:
+            capture_local.gray = gray
+    cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=gray)
+    return gray
+
+def capture_frame(out=None):
+    """
+    Captures one frame of the capture region for a detection tick (into out, see grab_screen_gray).
+    The ORB features of the frame are computed on first use and shared by every scale and template.
+    'offset' is the desktop position of the frame's top-left pixel.
+    """
+    monitor = get_capture_monitor()
+    return {
+        'gray': grab_screen_gray(monitor, out),
+        'offset': (monitor['left'], monitor['top']),
+        'features': None,
+        'coarse': {},
+        'regions': {}
+    }
+
+def extract_features(gray, origin=(0, 0)):
+    """
+    Runs ORB on a grayscale image and returns a feature dict {'pts', 'sizes', 'des', 'matchers'}.
+    'pts' is a float32 Nx2 array shifted by origin, so a crop can report frame coordinates;
+    'sizes' holds the keypoint diameters used to infer the on-screen scale of a match.
+    'matchers' holds the matchers built on 'des' by each thread (see get_feature_matcher).
+    """
+    tiles = settings['feature_tiles']
+    if tiles > 1 and min(gray.shape[:2]) >= tiles * FEATURE_TILE_MIN_SIZE:
+        pts, sizes, des = detect_orb_tiled(gray, tiles)
+    else:
+        pts, sizes, des = detect_orb(gray)
+    return {'pts': pts + np.float32(origin), 'sizes': sizes, 'des': des, 'matchers': {}}
+
+def detect_orb(gray, nfeatures=ORB_NFEATURES):
+    """Runs ORB on a grayscale image. Returns (pts Nx2 float32, sizes, descriptors or None)."""
+    kp, des = get_orb(nfeatures).detectAndCompute(gray, None)
+    if not kp:
+        # Plain areas (black loading screens, game borders) have no keypoints at all
+        return np.zeros((0, 2), dtype=np.float32), np.zeros(0, dtype=np.float32), None
+    pts = cv2.KeyPoint_convert(kp).reshape(-1, 2)
+    sizes = np.fromiter((k.size for k in kp), dtype=np.float32, count=len(kp))
+    return pts, sizes, des
+
+def get_tile_executor(tiles):
+    """
+    Returns the shared thread pool used for tile-parallel extraction, sized for tiles x tiles.
+    A pool of the wrong size is replaced rather than shut down, so a thread still submitting
+    to it is unaffected; its idle workers exit once it is no longer referenced.
+    """
+    global tile_executor, tile_executor_workers
+    workers = min(tiles * tiles, os.cpu_count() or 4)
+    with tile_executor_lock:
+        if tile_executor is None or tile_executor_workers != workers:
+            tile_executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+            tile_executor_workers = workers
+        return tile_executor
+
+def detect_orb_tiled(gray, tiles):
+    """
+    Runs ORB concurrently on a tiles x tiles grid, each tile with an equal share of
+    ORB_NFEATURES, so one busy part of the screen cannot take the whole feature budget.
+    Tiles overlap by FEATURE_TILE_OVERLAP px so keypoints near a cut keep their full patch,
+    and each keypoint is kept only by the tile whose core contains it, which drops the
+    duplicates found twice in the overlap. Returns the merged (pts, sizes, descriptors).
+    """
+    height, width = gray.shape[:2]
+    xs = np.linspace(0, width, tiles + 1).astype(int)
+    ys = np.linspace(0, height, tiles + 1).astype(int)
+    budget = -(-ORB_NFEATURES // (tiles * tiles))
+    executor = get_tile_executor(tiles)
+
+    jobs = []
+    for i in range(tiles):
+        for j in range(tiles):
+            core = (xs[j], ys[i], xs[j + 1], ys[i + 1])
+            x0, y0 = max(core[0] - FEATURE_TILE_OVERLAP, 0), max(core[1] - FEATURE_TILE_OVERLAP, 0)
+            x1, y1 = min(core[2] + FEATURE_TILE_OVERLAP, width), min(core[3] + FEATURE_TILE_OVERLAP, height)
+            jobs.append((core, (x0, y0), executor.submit(detect_orb, gray[y0:y1, x0:x1], budget)))
+
+    pts_parts, size_parts, des_parts = [], [], []
+    for core, tile_origin, future in jobs:
+        pts, sizes, des = future.result()
+        if des is None or len(pts) == 0:
+            # Plain tiles (a black game border, an empty panel) contribute nothing
+            continue
+        pts = pts + np.float32(tile_origin)
+        keep = (pts[:, 0] >= core[0]) & (pts[:, 0] < core[2]) & (pts[:, 1] >= core[1]) & (pts[:, 1] < core[3])
+        pts_parts.append(pts[keep])
+        size_parts.append(sizes[keep])
+        des_parts.append(des[keep])
+
+    if not des_parts:
+        return np.zeros((0, 2), dtype=np.float32), np.zeros(0, dtype=np.float32), None
+    return np.concatenate(pts_parts), np.concatenate(size_parts), np.concatenate(des_parts)
+
+def get_frame_features(frame):
+    """Returns the features of the whole frame, computing them only once per frame."""
+    if frame['features'] is None:
+        frame['features'] = extract_features(frame['gray'])
+    return frame['features']
+
+def get_region_features(frame, box):
+    """
+    Returns the features of the part of the frame covered by a desktop-space box,
+    with points in frame coordinates. Each region is computed once per frame.
+    Returns None if the box lies outside the frame.
+    """
+    height, width = frame['gray'].shape[:2]
+    x0 = max(int(box[0] - frame['offset'][0]), 0)
+    y0 = max(int(box[1] - frame['offset'][1]), 0)
+    x1 = min(int(box[0] + box[2] - frame['offset'][0]), width)
+    y1 = min(int(box[1] + box[3] - frame['offset'][1]), height)
+    if x1 - x0 < 20 or y1 - y0 < 20:
+        return None
+
+    key = (x0, y0, x1, y1)
+    if key not in frame['regions']:
+        frame['regions'][key] = extract_features(frame['gray'][y0:y1, x0:x1], (x0, y0))
+    return frame['regions'][key]
+
+def make_frame_thumbnail(frame):
+    """Returns a small area-averaged copy of the frame used to detect screen changes."""
+    return cv2.resize(frame['gray'], CHANGE_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+def thumbnail_difference(reference_thumbnail, thumbnail):
+    """Returns the mean absolute difference of two thumbnails in gray levels (infinite if not comparable)."""
+    if reference_thumbnail is None or reference_thumbnail.shape != thumbnail.shape:
+        return float('inf')
+    return cv2.norm(reference_thumbnail, thumbnail, cv2.NORM_L1) / thumbnail.size
+
+def frame_has_changed(reference_thumbnail, thumbnail):
+    """
+    Returns True if the screen changed noticeably since the reference thumbnail was taken.
+    The thumbnails are compared cell by cell (CHANGE_GRID), so one card swapped in its slot
+    counts as a change instead of being averaged away over the whole screen, while a few
+    sparkling pixels stay below CHANGE_THRESHOLD in their cell.
     """
-    Captures a screenshot and counts how many times the template image is found
+    if reference_thumbnail is None or reference_thumbnail.shape != thumbnail.shape:
+        return True
+    cell_differences = cv2.resize(cv2.absdiff(reference_thumbnail, thumbnail), CHANGE_GRID, interpolation=cv2.INTER_AREA)
+    return float(cell_differences.max()) > CHANGE_THRESHOLD
+
+def update_motion_state(motion, thumbnail):
+    """
+    Tracks frame-to-frame motion energy for the stability gate.
+    motion is {'thumbnail': previous thumbnail, 'calm_frames': calm frames in a row};
+    returns True once the screen has been calm for settings['stable_frames'] frames.
+    """
+    if thumbnail_difference(motion['thumbnail'], thumbnail) > MOTION_THRESHOLD:
+        motion['calm_frames'] = 0
+    else:
+        motion['calm_frames'] += 1
+    motion['thumbnail'] = thumbnail
+    return motion['calm_frames'] >= settings['stable_frames']
+
+def get_coarse_features(frame, factor):
+    """
+    Returns the features of the frame downsampled by factor, computed once per frame.
+    Points are scaled back up, so they are in full-resolution frame coordinates.
+    """
+    if factor not in frame['coarse']:
+        small = cv2.resize(frame['gray'], None, fx=1.0 / factor, fy=1.0 / factor, interpolation=cv2.INTER_AREA)
+        features = extract_features(small)
+        features['pts'] *= factor
+        features['sizes'] *= factor
+        frame['coarse'][factor] = features
+    return frame['coarse'][factor]
+
+def frame_box_to_desktop(frame, pts):
+    """Returns the bounding box (x, y, w, h) of frame points in desktop coordinates."""
+    x, y, w, h = cv2.boundingRect(np.float32(pts).reshape(-1, 2))
+    return (x + frame['offset'][0], y + frame['offset'][1], w, h)
+
+def count_image_on_screen_orb(template, frame=None):
+    """
+    Counts how many times a template (from build_template_pyramid) is found on the screen
     using ORB and Homography.
+    If frame (from capture_frame) is given it is matched against that frame, otherwise a new screenshot is taken.
     Returns a tuple: (count found, percentage accuracy).
     """
-    sct = mss.mss()
-    screen_shot = sct.grab(sct.monitors[0])
-    screen_np = np.array(screen_shot)
-    screen_gray = cv2.cvtColor(screen_np, cv2.COLOR_BGRA2GRAY)
+    found_count, best_accuracy, _ = locate_template(template, frame)
+    return found_count, best_accuracy
+
+def locate_template(template, frame=None, search_box=None, name=None):
+    """
+    Same search as count_image_on_screen_orb, but also returns where the template was found.
+    If search_box (desktop coordinates) is given, only that part of the frame is searched.
+    If the template's name is given, its scale memory is used and updated.
+    Returns a tuple: (count found, percentage accuracy, box) where box is (x, y, w, h)
+    of the card's outline in desktop coordinates, or None when nothing was found.
+    """
+    return locate_templates({name: template}, frame, search_box)[name]
+
+def locate_templates(named_templates, frame=None, search_box=None):
+    """
+    Searches several templates at once with a single k-NN match of their combined
+    descriptor index against the frame (or the search_box part of it).
+    Returns {name: (count found, percentage accuracy, box)} like locate_template.
+    """
+    if frame is None:
+        frame = capture_frame()
+    if search_box is None and settings['coarse_factor'] > 1:
+        return locate_templates_coarse_to_fine(named_templates, frame, settings['coarse_factor'])
+    if search_box is None:
+        features = get_frame_features(frame)
+    else:
+        features = get_region_features(frame, search_box)
+    return match_templates_features(named_templates, frame, features)
+
+def match_templates_features(named_templates, frame, features):
+    """Matches several templates against already extracted frame features. Returns results like locate_templates."""
+    index = get_match_index(named_templates)
+    results = {}
+    for name, (found_count, accuracy, card_pts) in match_index_features(index, features).items():
+        box = frame_box_to_desktop(frame, card_pts) if found_count else None
+        results[name] = (found_count, accuracy, box)
+    return results
+
+def locate_templates_coarse_to_fine(named_templates, frame, factor):
+    """
+    Two-stage search. Stage one matches every template's coarse levels (its scales divided
+    by factor) against the 1/factor-scale frame to find candidate boxes. Stage two confirms
+    each candidate with a full-resolution match on a padded crop, so the returned accuracy
+    and box mean the same as a full-resolution search. Templates the coarse stage misses
+    (small cards lose too many features when downsampled) or whose candidate is not
+    confirmed share one full-resolution search of the whole frame.
+    """
+    index = get_match_index(named_templates, factor)
+    if index['des'] is None:
+        # Every coarse level was pruned, a coarse pass could only miss
+        return match_templates_features(named_templates, frame, get_frame_features(frame))
+    candidates = match_index_features(index, get_coarse_features(frame, factor), factor)
+
+    results = {}
+    for name, template in named_templates.items():
+        found_count, _, card_pts = candidates[name]
+        if found_count:
+            candidate_box = pad_box(frame_box_to_desktop(frame, card_pts), COARSE_CANDIDATE_PADDING)
+            results[name] = locate_template(template, frame, candidate_box, name)
+
+    missed = {name: template for name, template in named_templates.items() if not results.get(name, (0,))[0]}
+    if missed:
+        results.update(match_templates_features(missed, frame, get_frame_features(frame)))
+    return results
+
+def build_match_index(named_templates, factor=1):
+    """
+    Stacks the descriptors of every scale level of every template into one matrix
+    (the coarse levels for factor when factor > 1).
+    Each row is tagged with a group id; groups[id] is (template name, level) and
+    group_name_ids[id] is the position of that name in 'names', so matches can be
+    split back per template and scale after one k-NN call.
+    'sizes' divided by 'scales' gives each row's keypoint size at template scale 1.0.
+    group_corners[id] holds the corners of that level's image, so a fitted transform
+    gives the outline of the whole card and not just of its matched points.
+    """
+    groups = []
+    group_name_ids = []
+    group_corners = []
+    des_parts = []
+    pts_parts = []
+    size_parts = []
+    scale_parts = []
+    group_ids = []
+    for name_id, (name, template) in enumerate(named_templates.items()):
+        for level in template['levels'] if factor == 1 else template['coarse'].get(factor, []):
+            group_ids.append(np.full(len(level['des']), len(groups), dtype=np.int32))
+            groups.append((name, level))
+            group_name_ids.append(name_id)
+            height, width = template['shape'][0] * level['scale'], template['shape'][1] * level['scale']
+            group_corners.append(np.float32([[0, 0], [width, 0], [width, height], [0, height]]).reshape(-1, 1, 2))
+            des_parts.append(level['des'])
+            pts_parts.append(level['pts'])
+            size_parts.append(level['sizes'])
+            scale_parts.append(np.full(len(level['des']), level['scale'], dtype=np.float32))
+
+    return {
+        'names': list(named_templates),
+        'groups': groups,
+        'group_name_ids': np.array(group_name_ids, dtype=np.int32),
+        'group_corners': group_corners,
+        'group_ids': np.concatenate(group_ids) if groups else np.zeros(0, dtype=np.int32),
+        'des': np.concatenate(des_parts) if groups else None,
+        'pts': np.concatenate(pts_parts) if groups else None,
+        'sizes': np.concatenate(size_parts) if groups else None,
+        'scales': np.concatenate(scale_parts) if groups else None
+    }
 
-    found_count = 0
-    best_accuracy = 0
+def get_match_index(named_templates, factor=1):
+    """Returns the combined descriptor index of a template set, reusing it while the set is unchanged."""
+    key = (factor,) + tuple((name, id(template)) for name, template in named_templates.items())
+    index = match_index_cache.get(key)
+    if index is None:
+        if len(match_index_cache) >= MATCH_INDEX_CACHE_SIZE:
+            match_index_cache.clear()
+        index = build_match_index(named_templates, factor)
+        match_index_cache[key] = index
+    return index
+
+def create_matcher(backend, train_des):
+    """
+    Prepares a k-NN search over binary train descriptors with the given backend.
+    Returns a matcher dict for knn_match.
+    """
+    matcher = {'backend': backend, 'des': train_des, 'index': None}
+    if backend == 'flann':
+        matcher['index'] = cv2.flann_Index(train_des, FLANN_LSH_INDEX_PARAMS)
+    return matcher
 
-    for scale in np.linspace(1.0, 0.2, 5): 
-        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
+def knn_match(matcher, query_des):
+    """
+    Finds the two nearest train descriptors of every query descriptor.
+    Returns (train_idx, distances) as Nx2 arrays; train_idx is -1 where no neighbour was found.
+    """
+    if matcher['backend'] == 'flann':
+        train_idx, distances = matcher['index'].knnSearch(query_des, 2, params=FLANN_SEARCH_PARAMS)
+    elif matcher['backend'] == 'numpy':
+        train_idx, distances = numpy_knn_match(query_des, matcher['des'])
+    else:
+        distances, train_idx = cv2.batchDistance(query_des, matcher['des'], cv2.CV_32S, normType=cv2.NORM_HAMMING, K=2)
+    return train_idx, distances
+
+def numpy_knn_match(query_des, train_des):
+    """
+    Brute-force two-nearest-neighbour Hamming search in pure NumPy. Distances are the
+    popcount (POPCOUNT_TABLE lookup) of the XOR of the packed uint8 descriptors, computed
+    in chunks of query rows so each chunk's XOR block stays about NUMPY_MATCH_CHUNK_BYTES.
+    It is 11-22x slower than the 'bf' default (about 17x on average, see the timings above
+    MATCHER_BACKENDS), so it is only a dependency-free reference, not a faster path.
+    Returns (train_idx, distances) like knn_match.
+    """
+    train_idx = np.full((len(query_des), 2), -1, dtype=np.int32)
+    distances = np.full((len(query_des), 2), np.iinfo(np.int32).max, dtype=np.int32)
+    if len(train_des) < 2:
+        return train_idx, distances
+
+    query_des = np.ascontiguousarray(query_des)
+    train_des = np.ascontiguousarray(train_des)
+    chunk_rows = max(1, NUMPY_MATCH_CHUNK_BYTES // train_des.nbytes)
+    for start in range(0, len(query_des), chunk_rows):
+        chunk = query_des[start:start + chunk_rows]
+        xor = np.bitwise_xor(chunk[:, None, :], train_des[None, :, :])
+        chunk_distances = POPCOUNT_TABLE[xor].sum(axis=2, dtype=np.int32)
+
+        # Two smallest per row, then put them in nearest-first order
+        top2 = np.argpartition(chunk_distances, 1, axis=1)[:, :2]
+        top2_distances = np.take_along_axis(chunk_distances, top2, axis=1)
+        order = np.argsort(top2_distances, axis=1)
+        train_idx[start:start + len(chunk)] = np.take_along_axis(top2, order, axis=1)
+        distances[start:start + len(chunk)] = np.take_along_axis(top2_distances, order, axis=1)
+    return train_idx, distances
+
+def get_feature_matcher(features):
+    """
+    Returns this thread's matcher on a set of screen features, built once per frame (or region)
+    and thread, and reused by every match against it in the tick.
+    """
+    thread_id = threading.get_ident()
+    if thread_id not in features['matchers']:
+        features['matchers'][thread_id] = create_matcher(settings['matcher'], features['des'])
+    return features['matchers'][thread_id]
+
+def ratio_test_matches(index, train_idx, distances):
+    """
+    Applies the ratio test to k-NN results of an index and sorts the surviving matches
+    by group, then distance. Returns a dict of equally long arrays
+    {'query', 'train', 'distance', 'group'} plus 'slices': {group id: slice of that group}.
+    """
+    passed = (train_idx[:, 1] >= 0) & (distances[:, 0] < RATIO_TEST * distances[:, 1])
+    query = np.flatnonzero(passed)
+    group = index['group_ids'][query]
+    distance = distances[query, 0]
+    order = np.lexsort((distance, group))
+    query, group, distance = query[order], group[order], distance[order]
+
+    group_ids, starts, counts = np.unique(group, return_index=True, return_counts=True)
+    return {
+        'query': query,
+        'train': train_idx[query, 0],
+        'distance': distance,
+        'group': group,
+        'slices': {int(g): slice(int(a), int(a + n)) for g, a, n in zip(group_ids, starts, counts)}
+    }
+
+def match_index_features(index, features, scale_factor=1):
+    """
+    Runs one k-NN match of a combined descriptor index against screen features, applies
+    the ratio test and verifies each template's matches scale by scale, starting at the
+    scale of its last hit and moving outward. With settings['scale_inference'] only the
+    levels nearest the inferred scale are verified, after the level of the last hit. scale_factor is how much the screen
+    was downsampled, so a level's on-screen scale is its scale times scale_factor.
+    Returns {name: (count found, percentage accuracy, card corner screen points or None)}.
+    """
+    results = {name: (0, 0, None) for name in index['names']}
+    if index['des'] is None or features is None or features['des'] is None or len(features['des']) < MIN_MATCH_COUNT:
+        return results
+
+    train_idx, distances = knn_match(get_feature_matcher(features), index['des'])
+    matches = ratio_test_matches(index, train_idx, distances)
+
+    if settings['scale_inference']:
+        group_order = infer_scale_groups(index, features, matches, scale_factor)
+    else:
+        group_order = remembered_scale_groups(index, matches, scale_factor)
+
+    for group_id in group_order:
+        name, level = index['groups'][group_id]
+        if results[name][0] or group_id not in matches['slices']:
             continue
-            
-        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
-        
-        kp1, des1 = orb.detectAndCompute(scaled_template, None)
-        kp2, des2 = orb.detectAndCompute(screen_gray, None)
-        
-        if des1 is None or des2 is None or len(des1) < MIN_MATCH_COUNT or len(des2) < MIN_MATCH_COUNT:
+        # Matches of a group are sorted by distance, keep the 50 best
+        group_slice = matches['slices'][group_id]
+        start = group_slice.start
+        best = slice(start, min(group_slice.stop, start + 50))
+        if best.stop - best.start < MIN_MATCH_COUNT:
             continue
-            
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        matches = bf.match(des1, des2)
-        matches = sorted(matches, key=lambda x: x.distance)
-        
-        good_matches = matches[:50]
+
+        src_pts = index['pts'][matches['query'][best]].reshape(-1, 1, 2)
+        dst_pts = features['pts'][matches['train'][best]].reshape(-1, 1, 2)
+        found_count, accuracy, card_pts = verify_matches(src_pts, dst_pts, level['scale'], index['group_corners'][group_id])
+        if found_count:
+            results[name] = (found_count, accuracy, card_pts)
+            if name is not None:
+                settings['scale_memory'][name] = round(level['scale'] * scale_factor, 4)
+    return results
+
+def order_groups_outward(index, group_ids, anchor_scale, scale_factor):
+    """Sorts group ids by how far their on-screen scale is from anchor_scale, nearest first."""
+    level_scales = np.float32([index['groups'][g][1]['scale'] * scale_factor for g in group_ids])
+    return [int(group_ids[i]) for i in np.argsort(np.abs(np.log(level_scales / anchor_scale)), kind='stable')]
+
+def remembered_scale_groups(index, matches, scale_factor):
+    """
+    Returns every group id that has matches, per template spiralling outward from the
+    scale remembered in settings['scale_memory'] (largest scale first if none is known).
+    """
+    group_order = []
+    for name in index['names']:
+        group_ids = np.int32([g for g in matches['slices'] if index['groups'][g][0] == name])
+        remembered = settings['scale_memory'].get(name)
+        if remembered:
+            group_order.extend(order_groups_outward(index, group_ids, remembered, scale_factor))
+        else:
+            group_order.extend(int(g) for g in np.sort(group_ids))
+    return group_order
+
+def infer_scale_groups(index, features, matches, scale_factor=1):
+    """
+    Estimates each template's on-screen scale from the matched keypoint sizes (ORB keypoints
+    grow with the scale they are detected at) using the median over its 50 best matches.
+    Returns the ids of the SCALE_INFERENCE_LEVELS groups per template whose level scale is
+    closest to that estimate, so only those are verified instead of every level.
+    Screen keypoint sizes are in full-resolution pixels (get_coarse_features scales them back up),
+    so the estimate is a full-resolution scale and is compared with each level's scale times
+    scale_factor, the on-screen scale that level stands for on a 1/scale_factor frame.
+    The level nearest the scale remembered in settings['scale_memory'] is verified first,
+    so a card that keeps its size is confirmed on the first fit even if the estimate is off.
+    """
+    name_of_match = index['group_name_ids'][matches['group']]
+    group_order = []
+    for name_id in np.unique(name_of_match):
+        selected = np.flatnonzero(name_of_match == name_id)
+        if len(selected) < MIN_MATCH_COUNT:
+            continue
+        best = selected[np.argsort(matches['distance'][selected], kind='stable')[:50]]
+        query, train = matches['query'][best], matches['train'][best]
+        scale = float(np.median(index['scales'][query] * features['sizes'][train] / index['sizes'][query]))
+
+        candidates = np.unique(matches['group'][selected])
+        nearest = order_groups_outward(index, candidates, scale, scale_factor)[:SCALE_INFERENCE_LEVELS]
+        remembered = settings['scale_memory'].get(index['names'][name_id])
+        if remembered:
+            first = order_groups_outward(index, candidates, remembered, scale_factor)[0]
+            nearest = [first] + [g for g in nearest if g != first]
+        group_order.extend(nearest)
+    return group_order
+
+def verify_matches(src_pts, dst_pts, level_scale=1.0, corners=None):
+    """
+    Checks that matched points agree on one geometric transform of the settings['geometry'] model.
+    Cards are only ever moved and uniformly scaled, so by default a 4-DOF similarity is fitted
+    and fits with an implausible scale or rotation are rejected. level_scale is the scale of
+    the template level src_pts come from and corners (Nx1x2) its image corners.
+    Returns a tuple: (count found, percentage accuracy, screen points or None), where the points
+    are the corners projected through the fitted transform, or the inliers if no corners are given.
+    """
+    if settings['geometry'] == 'homography':
+        M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+    elif settings['geometry'] == 'usac':
+        # estimateAffinePartial2D only takes RANSAC/LMEDS, so USAC fits a full affine
+        # transform and rejects the ones that are not close to a similarity.
+        # Older OpenCV builds have no USAC, plain RANSAC is used there
+        method = getattr(cv2, 'USAC_MAGSAC', cv2.RANSAC)
+        M, mask = cv2.estimateAffine2D(src_pts, dst_pts, method=method, ransacReprojThreshold=5.0)
+        if M is not None and not (is_near_similarity(M) and is_plausible_similarity(M, level_scale)):
+            M = None
+    else:
+        M, mask = cv2.estimateAffinePartial2D(src_pts, dst_pts, method=cv2.RANSAC, ransacReprojThreshold=5.0)
+        if M is not None and not is_plausible_similarity(M, level_scale):
+            M = None
+
+    if M is not None:
+        inlier_mask = mask.ravel() != 0
+        inliers = int(np.count_nonzero(inlier_mask))
         
-        if len(good_matches) >= MIN_MATCH_COUNT:
-            src_pts = np.float32([ kp1[m.queryIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
-            dst_pts = np.float32([ kp2[m.trainIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
-            
-            M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
-
-            if M is not None:
-                matches_mask = mask.ravel().tolist()
-                inliers = sum(matches_mask)
-                
-                if inliers >= MIN_MATCH_COUNT:
-                    accuracy_percent = (inliers / len(good_matches)) * 100
-                    found_count = 1
-                    best_accuracy = max(best_accuracy, accuracy_percent)
-                    return found_count, best_accuracy
-    return found_count, best_accuracy
+        if inliers >= MIN_MATCH_COUNT:
+            accuracy_percent = (inliers / len(src_pts)) * 100
+            if corners is None:
+                return 1, accuracy_percent, dst_pts[inlier_mask]
+            if M.shape[0] == 3:
+                return 1, accuracy_percent, cv2.perspectiveTransform(corners, M)
+            return 1, accuracy_percent, cv2.transform(corners, M)
+    return 0, 0, None
+
+def is_near_similarity(M):
+    """Returns True if a 2x3 affine transform scales both axes alike and has almost no shear."""
+    scale_x = float(np.hypot(M[0, 0], M[1, 0]))
+    scale_y = float(np.hypot(M[0, 1], M[1, 1]))
+    if scale_x == 0 or scale_y == 0:
+        return False
+    shear = abs(float(M[0, 0] * M[0, 1] + M[1, 0] * M[1, 1])) / (scale_x * scale_y)
+    return abs(scale_x / scale_y - 1) <= MAX_CARD_DISTORTION and shear <= MAX_CARD_DISTORTION
+
+def is_plausible_similarity(M, level_scale):
+    """Returns True if a 2x3 similarity transform has a card-like scale and almost no rotation."""
+    scale = level_scale * float(np.hypot(M[0, 0], M[1, 0]))
+    rotation = abs(float(np.degrees(np.arctan2(M[1, 0], M[0, 0]))))
+    return PLAUSIBLE_CARD_SCALE[0] <= scale <= PLAUSIBLE_CARD_SCALE[1] and rotation <= MAX_CARD_ROTATION
+
+def pad_box(box, padding):
+    """Grows a (x, y, w, h) box by a fraction of its size on every side."""
+    x, y, w, h = box
+    pad_x, pad_y = int(w * padding), int(h * padding)
+    return (x - pad_x, y - pad_y, w + 2 * pad_x, h + 2 * pad_y)
+
+def union_boxes(boxes):
+    """Returns the smallest (x, y, w, h) box that contains every given box."""
+    x0 = min(b[0] for b in boxes)
+    y0 = min(b[1] for b in boxes)
+    x1 = max(b[0] + b[2] for b in boxes)
+    y1 = max(b[1] + b[3] for b in boxes)
+    return (x0, y0, x1 - x0, y1 - y0)
+
+def wants_hot_search(name):
+    """Returns True if the template should only be searched in its hot region this tick."""
+    hot = hot_regions.get(name)
+    return bool(hot and hot['boxes'] and hot['misses'] < HOT_REGION_MAX_MISSES)
+
+def locate_template_hot(name, template, frame):
+    """
+    Searches the padded area of the template's recent hits first and only falls back to
+    a full-frame search after HOT_REGION_MAX_MISSES misses in a row (or before any hit is known).
+    Returns the same tuple as locate_template.
+    """
+    if wants_hot_search(name):
+        search_box = pad_box(union_boxes(hot_regions[name]['boxes']), HOT_REGION_PADDING)
+        result = locate_template(template, frame, search_box, name)
+    else:
+        result = locate_template(template, frame, name=name)
+    record_hot_result(name, result)
+    return result
+
+def record_hot_result(name, result):
+    """Updates a template's hot region after a search."""
+    hot = hot_regions.setdefault(name, {'boxes': [], 'misses': 0})
+    if result[0]:
+        hot['boxes'] = (hot['boxes'] + [result[2]])[-HOT_REGION_HISTORY:]
+        hot['misses'] = 0
+    elif hot['boxes'] and hot['misses'] < HOT_REGION_MAX_MISSES:
+        hot['misses'] += 1
+    else:
+        # The full-frame fallback missed too: go back to cheap hot-region checks
+        hot['misses'] = 0
+
+def detect_templates(named_templates, frame):
+    """
+    Runs one detection tick for several templates on the same frame.
+    Templates with an active hot region are searched there; all the others
+    share a single combined full-frame match.
+    Returns {name: (count found, percentage accuracy, box)}.
+    """
+    full_frame = {name: t for name, t in named_templates.items() if not wants_hot_search(name)}
+    results = locate_templates(full_frame, frame) if full_frame else {}
+    for name, result in results.items():
+        record_hot_result(name, result)
+
+    for name, template in named_templates.items():
+        if name not in results:
+            results[name] = locate_template_hot(name, template, frame)
+    return results
+
+def prepare_full_frame_features(frame, named_templates):
+    """Extracts the features a full-frame search of these templates on this frame will use (coarse or full resolution)."""
+    factor = settings['coarse_factor']
+    if factor > 1 and get_match_index(named_templates, factor)['des'] is not None:
+        get_coarse_features(frame, factor)
+    else:
+        get_frame_features(frame)
+
+def detect_templates_parallel(named_templates, frame, executor, in_flight):
+    """
+    Runs one detection tick with every template searched on its own pool thread
+    (hot region first, like locate_template_hot) against the shared frame.
+    Waits at most DETECTION_DEADLINE seconds, so the tick takes as long as the slowest
+    template rather than the sum of all of them. in_flight maps template names to searches
+    still running from earlier ticks; those are not submitted again until they finish.
+    Returns {name: (count found, percentage accuracy, box)} for the searches that finished.
+    """
+    for name in [name for name, future in in_flight.items() if future.done()]:
+        del in_flight[name]
+
+    if any(not wants_hot_search(name) for name in named_templates):
+        # Full-frame features are shared by every search, extract them once before fanning out
+        prepare_full_frame_features(frame, named_templates)
+
+    futures = {}
+    for name, template in named_templates.items():
+        if name not in in_flight:
+            futures[name] = executor.submit(locate_template_hot, name, template, frame)
+    concurrent.futures.wait(futures.values(), timeout=DETECTION_DEADLINE)
+
+    results = {}
+    for name, future in futures.items():
+        if future.done():
+            results[name] = future.result()
+        else:
+            in_flight[name] = future
+    return results
+
+def benchmark_matchers(repeats=3):
+    """
+    Times every matcher backend on a fresh frame against all loaded templates.
+    Returns a list of lines describing the setup and the measured times.
+    """
+    frame = capture_frame()
+    features = get_frame_features(frame)
+    named_templates = dict(templates)
+    if reset_template is not None:
+        named_templates[reset_image_name] = reset_template
+    index = get_match_index(named_templates)
+    if index['des'] is None or features['des'] is None or len(features['des']) < 2:
+        return ["ไม่มีข้อมูลเพียงพอสำหรับวัดความเร็ว"]
+
+    lines = [f"ภาพต้นแบบ: {len(index['des'])} descriptors, หน้าจอ: {len(features['des'])} descriptors"]
+    total_ms = {}
+    for backend, label in MATCHER_BACKENDS.items():
+        start = time.perf_counter()
+        matcher = create_matcher(backend, features['des'])
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            knn_match(matcher, index['des'])
+        match_ms = (time.perf_counter() - start) * 1000 / repeats
+        lines.append(f"{label}: สร้าง {build_ms:.1f} ms + จับคู่ {match_ms:.1f} ms")
+        total_ms[backend] = build_ms + match_ms
+    lines.append(f"เร็วที่สุด: {MATCHER_BACKENDS[min(total_ms, key=total_ms.get)]}")
+    return lines
 
 def show_notification_message_card(card_name, accuracy_percent):
     """Function to display a notification window for the card counter."""
@@ -221,64 +1223,547 @@ def stop_replay_macro():
         countdown_id = None
     update_macro_ui_for_idle()
 
-def run_card_main_loop():
-    """Main function for the card counter that runs in a background thread."""
-    while not card_stop_event.is_set():
-        if reset_template is not None:
-            current_reset_found, _ = count_image_on_screen_orb(reset_template)
-            if current_reset_found > 0:
-                root.after(0, lambda: card_status_label.config(text=f"กำลังรีเซ็ต!", style="Error.TLabel"))
-                for img_config in images_config:
-                    img_config['found'] = 0
-                root.after(0, update_card_gui)
-                time.sleep(1)
-                continue
-        
-        all_conditions_met = True
-        
+def new_detector_state():
+    """
+    Returns the state a detection loop keeps between ticks: the thumbnail and cached results
+    of the change gate, the motion state of the stability gate and the optional thread pool.
+    """
+    state = {
+        # Detection results are reused while the screen looks the same as when they were computed
+        'reference_thumbnail': None,
+        'cached_results': {},
+        'motion': {'thumbnail': None, 'calm_frames': 0},
+        'executor': None,
+        'in_flight': {},
+        # Scheduler: ticks run, tick each template was last searched, running search cost per template
+        'ticks': 0,
+        'last_searched': {},
+        'costs': {},
+        'anchor_present': None  # Anchor check result for the current screen
+    }
+    if settings['detector_threads'] > 0:
+        state['executor'] = concurrent.futures.ThreadPoolExecutor(max_workers=settings['detector_threads'])
+    return state
+
+def close_detector_state(state):
+    """Releases the thread pool of a detector state."""
+    if state['executor'] is not None:
+        state['executor'].shutdown(wait=False)
+
+def detect_tick(state, frame, pending_templates):
+    """
+    Runs the detection part of one tick on a frame. The reset check always runs;
+    the pending cards are only matched once the screen is stable and the anchor is present.
+    Returns {'stable', 'reset_found', 'screen_changed', 'results'} where results maps the
+    pending cards that have a result this tick to (count found, percentage accuracy, box).
+    """
+    state['ticks'] += 1
+    executor = state['executor']
+    if executor is not None:
+        # Searches that miss the deadline keep reading the frame after the next capture
+        frame['gray'] = frame['gray'].copy()
+
+    thumbnail = make_frame_thumbnail(frame)
+    screen_changed = frame_has_changed(state['reference_thumbnail'], thumbnail)
+    if screen_changed:
+        state['reference_thumbnail'] = thumbnail
+        state['cached_results'] = {}
+        state['anchor_present'] = None
+    cached_results = state['cached_results']
+
+    # Card matching waits until card-reveal animations have settled
+    is_stable = update_motion_state(state['motion'], thumbnail)
+
+    # ...and only runs on the result screen, recognised by its anchor
+    if is_stable and state['anchor_present'] is None:
+        state['anchor_present'] = anchor_present(frame)
+    on_result_screen = is_stable and state['anchor_present']
+
+    if executor is not None:
+        # Thread-pool mode: the reset check and (once the screen is stable) every card are searched at once
+        missing_templates = {}
+        if reset_template is not None and reset_image_name not in cached_results:
+            missing_templates[reset_image_name] = reset_template
+        if on_result_screen:
+            missing_templates.update({name: t for name, t in pending_templates.items() if name not in cached_results})
+        if missing_templates:
+            hot_names = {name for name in missing_templates if wants_hot_search(name)}
+            cache_tick_results(cached_results, detect_templates_parallel(missing_templates, frame, executor, state['in_flight']), hot_names)
+
+    reset_found = False
+    if reset_template is not None:
+        if reset_image_name not in cached_results and executor is None:
+            hot_names = {reset_image_name} if wants_hot_search(reset_image_name) else set()
+            result = locate_template_hot(reset_image_name, reset_template, frame)
+            cache_tick_results(cached_results, {reset_image_name: result}, hot_names)
+        reset_found = cached_results.get(reset_image_name, (0, 0, None))[0] > 0
+
+    tick = {'stable': is_stable, 'reset_found': reset_found, 'screen_changed': screen_changed, 'results': {}}
+    if reset_found or not on_result_screen:
+        return tick
+
+    if executor is None:
+        # The cards scheduled within the budget are matched in one combined pass
+        missing_templates = {name: t for name, t in pending_templates.items() if name not in cached_results}
+        if missing_templates:
+            if any(not wants_hot_search(name) for name in missing_templates):
+                # Full-frame features are paid once per tick however many cards are matched,
+                # so they are extracted up front and the budget only covers the matching
+                prepare_full_frame_features(frame, missing_templates)
+            scheduled_templates = schedule_templates(state, missing_templates, settings['tick_budget_ms'] / 1000)
+            hot_names = {name for name in scheduled_templates if wants_hot_search(name)}
+            start = time.perf_counter()
+            results = detect_templates(scheduled_templates, frame)
+            record_template_cost(state, scheduled_templates, time.perf_counter() - start)
+            cache_tick_results(cached_results, results, hot_names)
+    # Cards that were not scheduled or missed the deadline are searched again on a later tick
+    tick['results'] = {name: cached_results[name] for name in pending_templates if name in cached_results}
+    return tick
+
+def cache_tick_results(cached_results, results, hot_names):
+    """
+    Keeps the results of a tick that stay true while the screen is unchanged: every hit and
+    the misses of full-frame searches. A miss in a hot region (hot_names) only covered part of
+    the frame, so it is searched again next tick and its misses lead to the full-frame fallback.
+    """
+    for name, result in results.items():
+        if result[0] or name not in hot_names:
+            cached_results[name] = result
+
+def schedule_templates(state, named_templates, budget):
+    """
+    Picks the templates to search this tick within budget seconds (all of them when
+    settings['tick_budget_ms'] is 0). Templates that have waited longest since their last
+    search go first, then those with a hot region, then the given order (most-needed first).
+    Each template's cost is its running average share of the matching time (the shared
+    full-frame feature extraction is paid before scheduling and not counted); at least one template is
+    always searched and the others carry over, so every card is reached within a few ticks.
+    Returns {name: template} of the scheduled templates.
+    """
+    order = sorted(named_templates, key=lambda name: (state['last_searched'].get(name, 0), not wants_hot_search(name)))
+    if settings['tick_budget_ms'] > 0:
+        scheduled = []
+        planned = 0.0
+        for name in order:
+            cost = state['costs'].get(name, DEFAULT_TEMPLATE_COST)
+            if scheduled and planned + cost > budget:
+                break
+            scheduled.append(name)
+            planned += cost
+        order = scheduled
+
+    for name in order:
+        state['last_searched'][name] = state['ticks']
+    return {name: named_templates[name] for name in order}
+
+def record_template_cost(state, named_templates, elapsed):
+    """Updates the running search cost of templates that were searched together in elapsed seconds."""
+    cost = elapsed / max(len(named_templates), 1)
+    for name in named_templates:
+        previous = state['costs'].get(name)
+        if previous is None:
+            state['costs'][name] = cost
+        else:
+            state['costs'][name] = previous + TEMPLATE_COST_SMOOTHING * (cost - previous)
+
+def collect_pending_templates():
+    """
+    Reads the required counts from the GUI and returns {name: template} of the cards still missing,
+    the most-needed cards first. Cards already satisfied for this reset episode, already
+    counted on the current screen or still in their cooldown cannot change the outcome this
+    tick, so they are left out before any matching.
+    """
+    now = time.time()
+    pending_configs = []
+    for img_config in images_config:
+        try:
+            img_config['required'] = int(img_config['entry'].get())
+        except ValueError:
+            img_config['required'] = 0
+
+        if img_config['found'] >= img_config['required'] or img_config['name'] not in templates:
+            continue
+        # The screen still shows the card that was counted, matching it again proves nothing new
+        if img_config['counted_on_screen']:
+            continue
+        if now - img_config['last_found_time'] <= CARD_COOLDOWN:
+            continue
+        pending_configs.append(img_config)
+
+    pending_configs.sort(key=lambda c: c['required'] - c['found'], reverse=True)
+    return {c['name']: templates[c['name']] for c in pending_configs}
+
+def apply_detection_tick(tick, view):
+    """
+    Applies one detection tick to the card counts and the GUI: resets the counts on the
+    reset screen, counts new cards (once per screen, with a CARD_COOLDOWN per card), notifies,
+    and stops the macro once every card is found. view keeps {'shown_stable'} between ticks.
+    Returns 'reset', 'done' or 'continue'.
+    """
+    if tick['stable'] != view['shown_stable']:
+        view['shown_stable'] = tick['stable']
+        root.after(0, lambda stable=tick['stable']: show_card_motion_state(stable))
+
+    if tick['screen_changed']:
+        # A new screen may show the cards again, so they are matched again
         for img_config in images_config:
-            try:
-                img_config['required'] = int(img_config['entry'].get())
-            except ValueError:
-                img_config['required'] = 0
-
-            if img_config['found'] < img_config['required']:
-                template_img = templates.get(img_config['name'])
-                if template_img is not None:
-                    current_found, accuracy = count_image_on_screen_orb(template_img)
-                    
-                    if current_found > 0:
-                        current_time = time.time()
-                        if current_time - img_config['last_found_time'] > 2.0:
-                            img_config['found'] += current_found
-                            img_config['last_found_time'] = current_time
-                            
-                            root.after(0, lambda name=img_config['name'], acc=accuracy: show_notification_message_card(name, acc))
-                            play_notification_sound()
-                
-            if img_config['found'] < img_config['required']:
-                all_conditions_met = False
+            img_config['counted_on_screen'] = False
+
+    if tick['reset_found']:
+        root.after(0, lambda: card_status_label.config(text=f"กำลังรีเซ็ต!", style="Error.TLabel"))
+        # A new episode starts: every card counts from zero and no cooldown carries over
+        for img_config in images_config:
+            img_config['found'] = 0
+            img_config['last_found_time'] = 0
+            img_config['counted_on_screen'] = False
+        root.after(0, update_card_gui)
+        view['shown_stable'] = None
+        return 'reset'
+
+    if not tick['stable']:
+        return 'continue'
+    
+    all_conditions_met = True
+    results = tick['results']
+
+    for img_config in images_config:
+        if img_config['name'] in results:
+            current_found, accuracy, _ = results[img_config['name']]
+
+            if current_found > 0 and not img_config['counted_on_screen']:
+                current_time = time.time()
+                if current_time - img_config['last_found_time'] > CARD_COOLDOWN:
+                    img_config['found'] += current_found
+                    img_config['last_found_time'] = current_time
+                    img_config['counted_on_screen'] = True
+
+                    root.after(0, lambda name=img_config['name'], acc=accuracy: show_notification_message_card(name, acc))
+                    request_notification_sound()
+
+        if img_config['found'] < img_config['required']:
+            all_conditions_met = False
+    
+    root.after(100, update_card_gui)
+    
+    if all_conditions_met and images_config:
+        root.after(0, lambda: card_status_label.config(text="พบการ์ดครบแล้ว!", style="Success.TLabel"))
+        request_notification_sound()
         
-        root.after(100, update_card_gui)
+        # --- START OF USER CHANGE ---
+        # Now, stop the macro loop instead of pressing F8
+        if is_replaying:
+            root.after(0, stop_replay_macro)
+        # --- END OF USER CHANGE ---
         
-        if all_conditions_met and images_config:
-            root.after(0, lambda: card_status_label.config(text="พบการ์ดครบแล้ว!", style="Success.TLabel"))
-            play_notification_sound()
-            
-            # --- START OF USER CHANGE ---
-            # Now, stop the macro loop instead of pressing F8
-            if is_replaying:
-                root.after(0, stop_replay_macro)
-            # --- END OF USER CHANGE ---
-            
-            card_stop_event.set()
+        card_stop_event.set()
+        return 'done'
+    return 'continue'
+
+def new_stage_stats():
+    """Returns the counters one pipeline stage keeps: items handled, frames dropped and busy seconds."""
+    return {'count': 0, 'dropped': 0, 'busy': 0.0}
+
+def format_stage_stats(name, stats, elapsed):
+    """Returns one pipeline stage's throughput, average time per item and dropped frames as text."""
+    rate = stats['count'] / elapsed if elapsed > 0 else 0.0
+    average_ms = stats['busy'] * 1000 / stats['count'] if stats['count'] else 0.0
+    return f"{name}: {rate:.1f}/s, {average_ms:.1f} ms each, dropped {stats['dropped']}"
+
+def new_frame_slot():
+    """Returns an empty one-frame queue where a newer frame replaces one not taken yet."""
+    return {'frame': None, 'condition': threading.Condition()}
+
+def publish_frame(frame_slot, frame):
+    """Puts a frame in the slot and returns the frame it replaced, or None if the slot was empty."""
+    with frame_slot['condition']:
+        replaced = frame_slot['frame']
+        frame_slot['frame'] = frame
+        frame_slot['condition'].notify()
+    return replaced
+
+def take_latest_frame(frame_slot, timeout):
+    """Waits up to timeout seconds for a frame and takes it out of the slot (None on timeout)."""
+    with frame_slot['condition']:
+        frame_slot['condition'].wait_for(lambda: frame_slot['frame'] is not None, timeout)
+        frame = frame_slot['frame']
+        frame_slot['frame'] = None
+    return frame
+
+def run_capture_stage(frame_slot, free_buffers, stats):
+    """
+    Capture stage of the card pipeline: grabs a frame every 1 / settings['capture_fps'] seconds
+    into a buffer from free_buffers and publishes it to frame_slot. A frame the detection
+    stage has not taken yet is replaced (latest frame wins), counted as dropped and its
+    buffer reused, so capture never waits for detection.
+    """
+    interval = 1.0 / max(settings['capture_fps'], 0.1)
+    next_time = time.perf_counter()
+    try:
+        while not card_stop_event.is_set():
+            try:
+                buffer = free_buffers.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            start = time.perf_counter()
+            frame = capture_frame(buffer)
+            frame['buffer'] = frame['gray']
+            stats['busy'] += time.perf_counter() - start
+            stats['count'] += 1
+
+            replaced = publish_frame(frame_slot, frame)
+            if replaced is not None:
+                stats['dropped'] += 1
+                free_buffers.put(replaced['buffer'])
+
+            next_time = max(next_time + interval, time.perf_counter())
+            card_stop_event.wait(next_time - time.perf_counter())
+    finally:
+        close_capture_session()
+
+def request_notification_sound():
+    """Queues the notification sound for the notification stage, so detection never waits for it."""
+    try:
+        notification_queue.put_nowait('sound')
+    except queue.Full:
+        # A burst of sounds is already waiting
+        notification_stats['dropped'] += 1
+
+def run_notification_stage():
+    """Notification stage: plays the queued notification sounds one after another."""
+    while True:
+        notification_queue.get()
+        start = time.perf_counter()
+        play_notification_sound()
+        notification_stats['busy'] += time.perf_counter() - start
+        notification_stats['count'] += 1
+
+def run_card_main_loop():
+    """
+    Main function for the card counter that runs in a background thread. It is the detection
+    stage of a pipeline: run_capture_stage feeds it the latest frame at settings['capture_fps']
+    and run_notification_stage plays the sounds, so no stage waits for another.
+    """
+    frame_slot = new_frame_slot()
+    free_buffers = queue.Queue()
+    for _ in range(PIPELINE_FRAME_BUFFERS):
+        free_buffers.put(np.empty((0, 0), dtype=np.uint8))
+    capture_stats = new_stage_stats()
+    detect_stats = new_stage_stats()
+    capture_thread = threading.Thread(target=run_capture_stage, args=(frame_slot, free_buffers, capture_stats), daemon=True)
+    capture_thread.start()
+
+    state = new_detector_state()
+    view = {'shown_stable': None}
+    started = last_report = time.perf_counter()
+
+    while not card_stop_event.is_set():
+        # One frame per tick: the reset check and every card are matched against the same screenshot
+        frame = take_latest_frame(frame_slot, 0.5)
+        if frame is None:
+            continue
+
+        start = time.perf_counter()
+        tick = detect_tick(state, frame, collect_pending_templates())
+        outcome = apply_detection_tick(tick, view)
+        free_buffers.put(frame['buffer'])
+        detect_stats['busy'] += time.perf_counter() - start
+        detect_stats['count'] += 1
+
+        if start - last_report >= PIPELINE_STATS_INTERVAL:
+            last_report = start
+            report_pipeline_stats(capture_stats, detect_stats, start - started)
+        if outcome == 'done':
             break
-        
-        time.sleep(0.5)
+        if outcome == 'reset':
+            card_stop_event.wait(1)
     
+    capture_thread.join(timeout=1)
+    report_pipeline_stats(capture_stats, detect_stats, time.perf_counter() - started)
+    close_detector_state(state)
+    root.after(100, update_card_gui)
+    root.after(100, update_card_status_after_stop)
+
+def report_pipeline_stats(capture_stats, detect_stats, elapsed):
+    """
+    Shows the throughput of every pipeline stage since the card counter started in the
+    card tab (the .exe has no console) and prints it for runs from a terminal.
+    """
+    text = " | ".join([
+        format_stage_stats("capture", capture_stats, elapsed),
+        format_stage_stats("detect", detect_stats, elapsed),
+        format_stage_stats("notify", notification_stats, elapsed)
+    ])
+    print(text)
+    root.after(0, lambda: card_stats_label.config(text=text))
+
+def result_ring_dtype(count):
+    """Returns the record layout of one result ring slot for count card templates."""
+    return np.dtype([
+        ('seq', np.int64),
+        ('stable', np.int8),
+        ('reset_found', np.int8),
+        ('screen_changed', np.int8),
+        ('found', np.int32, (count,)),
+        ('accuracy', np.float32, (count,)),
+        ('scale', np.float32, (count,))  # Worker's scale_memory entry per card, 0 = none yet
+    ])
+
+def open_result_ring(shm, count):
+    """Returns the RESULT_RING_SLOTS result records stored in a shared memory block."""
+    return np.ndarray((RESULT_RING_SLOTS,), dtype=result_ring_dtype(count), buffer=shm.buf)
+
+def write_result_ring(ring, seq, tick, names):
+    """
+    Stores a detection tick in the ring slot of seq. The slot's seq is set to -1 while
+    the slot is written and to seq last, so a reader never takes a half-written slot.
+    """
+    slot = seq % RESULT_RING_SLOTS
+    ring['seq'][slot] = -1
+    ring['stable'][slot] = tick['stable']
+    ring['reset_found'][slot] = tick['reset_found']
+    ring['screen_changed'][slot] = tick['screen_changed']
+    for i, name in enumerate(names):
+        found, accuracy, _ = tick['results'].get(name, (0, 0, None))
+        ring['found'][slot, i] = found
+        ring['accuracy'][slot, i] = accuracy
+        ring['scale'][slot, i] = settings['scale_memory'].get(name, 0)
+    ring['seq'][slot] = seq
+
+def read_result_ring(ring, seq, names):
+    """
+    Returns the detection tick stored for seq (boxes are not shared, so they are None),
+    or None if that slot is not written yet or was overwritten while it was read.
+    The tick's 'scales' holds the worker's learned scale of every card that has one.
+    """
+    slot = seq % RESULT_RING_SLOTS
+    if ring['seq'][slot] != seq:
+        return None
+    stable = bool(ring['stable'][slot])
+    reset_found = bool(ring['reset_found'][slot])
+    screen_changed = bool(ring['screen_changed'][slot])
+    found = ring['found'][slot].copy()
+    accuracy = ring['accuracy'][slot].copy()
+    scales = ring['scale'][slot].copy()
+    if ring['seq'][slot] != seq:
+        return None
+
+    results = {name: (int(found[i]), float(accuracy[i]), None) for i, name in enumerate(names)}
+    learned = {name: round(float(scales[i]), 4) for i, name in enumerate(names) if scales[i] > 0}
+    return {'stable': stable, 'reset_found': reset_found, 'screen_changed': screen_changed, 'results': results, 'scales': learned}
+
+def detector_process_main(control_queue, shm_name, names, settings_snapshot):
+    """
+    Entry point of the detector worker process. Captures and detects like run_card_main_loop
+    and publishes every tick to the shared-memory result ring of run_card_process_loop.
+    Commands arrive on control_queue: ('pending', names) sets the cards still missing
+    and ('stop',) ends the process.
+    """
+    global reset_template
+    settings.update(settings_snapshot)
+    named_templates = {}
+    for name in names:
+        full_path = os.path.join(IMAGE_FOLDER, name)
+        if os.path.exists(full_path):
+            template = load_template_cached(full_path)
+            if template is not None:
+                named_templates[name] = template
+    reset_path = os.path.join(IMAGE_FOLDER, reset_image_name)
+    if os.path.exists(reset_path):
+        reset_template = load_template_cached(reset_path)
+    load_anchor_template()
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = open_result_ring(shm, len(names))
+    state = new_detector_state()
+    pending = list(names)
+    seq = 0
+    try:
+        while True:
+            try:
+                while True:
+                    command = control_queue.get_nowait()
+                    if command[0] == 'stop':
+                        return
+                    if command[0] == 'pending':
+                        pending = list(command[1])
+            except queue.Empty:
+                pass
+
+            frame = capture_frame()
+            tick = detect_tick(state, frame, {name: named_templates[name] for name in pending if name in named_templates})
+            seq += 1
+            write_result_ring(ring, seq, tick, names)
+            time.sleep(1 if tick['reset_found'] else 0.5)
+    finally:
+        close_detector_state(state)
+        close_capture_session()
+        del ring
+        shm.close()
+
+def run_card_process_loop():
+    """
+    Card counter loop of the detector-process mode. Capture and detection run in a worker
+    process (detector_process_main), so heavy matching never holds this interpreter's GIL;
+    this thread only reads the worker's ticks from a shared-memory result ring and applies
+    them like run_card_main_loop, so card_stop_event and the GUI callbacks work the same.
+    """
+    names = [img_config['name'] for img_config in images_config]
+    shm = shared_memory.SharedMemory(create=True, size=result_ring_dtype(len(names)).itemsize * RESULT_RING_SLOTS)
+    ring = open_result_ring(shm, len(names))
+    ring['seq'] = 0
+    control_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=detector_process_main, args=(control_queue, shm.name, names, dict(settings)), daemon=True)
+    process.start()
+
+    view = {'shown_stable': None}
+    sent_pending = None
+    last_seq = 0
+    try:
+        while not card_stop_event.is_set():
+            pending = list(collect_pending_templates())
+            if pending != sent_pending:
+                control_queue.put(('pending', pending))
+                sent_pending = pending
+
+            outcome = 'continue'
+            latest_seq = int(ring['seq'].max())
+            while last_seq < latest_seq and outcome != 'done':
+                last_seq += 1
+                tick = read_result_ring(ring, last_seq, names)
+                if tick is not None:
+                    # Scales learned in the worker are kept here, so save_settings() persists them
+                    settings['scale_memory'].update(tick['scales'])
+                    outcome = apply_detection_tick(tick, view)
+            if outcome == 'done':
+                break
+
+            if not process.is_alive():
+                print("Detector process stopped unexpectedly")
+                card_stop_event.set()
+                break
+            time.sleep(PROCESS_POLL_INTERVAL)
+    finally:
+        control_queue.put(('stop',))
+        process.join(timeout=2)
+        if process.is_alive():
+            process.terminate()
+        del ring
+        shm.close()
+        shm.unlink()
+
     root.after(100, update_card_gui)
     root.after(100, update_card_status_after_stop)
 
+def show_card_motion_state(is_stable):
+    """Shows in the status label whether the detector is waiting for animations to settle."""
+    if card_stop_event.is_set():
+        return
+    if is_stable:
+        card_status_label.config(text="กำลังค้นหา... (หน้าจอนิ่ง)", style="Info.TLabel")
+    else:
+        card_status_label.config(text="รอภาพนิ่ง (กำลังเคลื่อนไหว)", style="Default.TLabel")
+
 def update_card_gui():
     """Updates the values in the card counter GUI window."""
     for img_config in images_config:
@@ -290,6 +1775,8 @@ def update_card_status_after_stop():
     card_start_button.config(state=tk.NORMAL)
     card_stop_button.config(state=tk.DISABLED)
     save_config()
+    # Keeps the scales learned this run (scale_memory) for the next launch
+    save_settings()
 
 def start_card_program():
     """Starts the card counter program."""
@@ -298,13 +1785,15 @@ def start_card_program():
         for img_config in images_config:
             img_config['found'] = 0
             img_config['last_found_time'] = 0
+            img_config['counted_on_screen'] = False
         
         if not images_config:
             messagebox.showwarning("คำเตือน", "โปรดเพิ่มการ์ดที่ต้องการค้นหาก่อน")
             return
 
         card_stop_event.clear()
-        card_thread = threading.Thread(target=run_card_main_loop)
+        card_loop = run_card_process_loop if settings['detector_process'] else run_card_main_loop
+        card_thread = threading.Thread(target=card_loop)
         card_thread.daemon = True
         card_thread.start()
         card_status_label.config(text="กำลังค้นหา...", style="Info.TLabel")
@@ -334,6 +1823,227 @@ def toggle_accuracy_display():
     else:
         card_accuracy_button.config(text="ปิดเปอร์เซ็นต์")
 
+def describe_capture_region():
+    """Returns the capture region as text for the card counter GUI."""
+    region = settings['capture_region']
+    if not region:
+        return "พื้นที่จับภาพ: ทั้งหน้าจอ"
+    return f"พื้นที่จับภาพ: {region['width']}x{region['height']} ที่ ({region['left']}, {region['top']})"
+
+def set_capture_region(region):
+    """Stores a new capture region (None = whole desktop) and updates the GUI."""
+    settings['capture_region'] = region
+    save_settings()
+    card_region_label.config(text=describe_capture_region())
+
+def on_capture_monitor_selected(event=None):
+    """Uses the monitor chosen in the combobox as the capture region."""
+    index = card_monitor_combobox.current()
+    with mss.mss() as sct:
+        monitors = sct.monitors
+    if index <= 0 or index >= len(monitors):
+        set_capture_region(None)
+    else:
+        monitor = monitors[index]
+        set_capture_region({key: monitor[key] for key in ('left', 'top', 'width', 'height')})
+
+def list_capture_monitors():
+    """Returns the combobox entries: the whole desktop followed by every attached monitor."""
+    with mss.mss() as sct:
+        monitors = sct.monitors
+    entries = ["ทั้งหน้าจอ (ทุกจอ)"]
+    for i, monitor in enumerate(monitors[1:], start=1):
+        entries.append(f"จอที่ {i} ({monitor['width']}x{monitor['height']})")
+    return entries
+
+def select_capture_region():
+    """
+    Opens a translucent overlay over the whole desktop where the user drags
+    a box around the game window to use as the capture region.
+    """
+    with mss.mss() as sct:
+        desktop = sct.monitors[0]
+
+    overlay = tk.Toplevel(root)
+    overlay.overrideredirect(True)
+    overlay.attributes("-topmost", True)
+    overlay.attributes("-alpha", 0.3)
+    overlay.geometry(f"{desktop['width']}x{desktop['height']}+{desktop['left']}+{desktop['top']}")
+    canvas = tk.Canvas(overlay, bg="black", highlightthickness=0, cursor="cross")
+    canvas.pack(fill=tk.BOTH, expand=True)
+    canvas.create_text(desktop['width'] // 2, 40, text="ลากเพื่อเลือกพื้นที่หน้าต่างเกม (Esc เพื่อยกเลิก)", fill="white", font=thai_font_title)
+    drag = {'start': None, 'rect': None}
+
+    def on_press(event):
+        drag['start'] = (event.x_root, event.y_root)
+        if drag['rect']:
+            canvas.delete(drag['rect'])
+        drag['rect'] = canvas.create_rectangle(event.x, event.y, event.x, event.y, outline="#e74c3c", width=3)
+
+    def on_drag(event):
+        if drag['start']:
+            x0, y0 = drag['start']
+            canvas.coords(drag['rect'], x0 - desktop['left'], y0 - desktop['top'], event.x, event.y)
+
+    def on_release(event):
+        if not drag['start']:
+            return
+        x0, y0 = drag['start']
+        region = {
+            'left': min(x0, event.x_root),
+            'top': min(y0, event.y_root),
+            'width': abs(event.x_root - x0),
+            'height': abs(event.y_root - y0)
+        }
+        overlay.destroy()
+        region = clip_region_to_desktop(region, desktop)
+        if region is None:
+            messagebox.showwarning("คำเตือน", "พื้นที่ที่เลือกเล็กเกินไป")
+            return
+        card_monitor_combobox.set("กำหนดเอง")
+        set_capture_region(region)
+
+    canvas.bind("<ButtonPress-1>", on_press)
+    canvas.bind("<B1-Motion>", on_drag)
+    canvas.bind("<ButtonRelease-1>", on_release)
+    overlay.bind("<Escape>", lambda e: overlay.destroy())
+    overlay.focus_force()
+
+def describe_anchor():
+    """Returns the anchor setting as text for the card counter GUI."""
+    if not settings['anchor_image']:
+        return "Anchor: ไม่ใช้"
+    area = "เฉพาะพื้นที่" if settings['anchor_box'] else "ทั้งหน้าจอ"
+    return f"Anchor: {settings['anchor_image']} ({area})"
+
+def select_anchor_image():
+    """
+    Lets the user pick the anchor image (a small UI element only shown on the result screen).
+    If the anchor is visible on the screen now, the area around it becomes its fixed ROI;
+    otherwise the whole frame is searched. Cancelling offers to stop using an anchor.
+    """
+    file_path = filedialog.askopenfilename(
+        title="เลือกภาพ Anchor ของหน้าผลลัพธ์",
+        filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")]
+    )
+    if not file_path:
+        if settings['anchor_image'] and messagebox.askyesno("Anchor", "เลิกใช้ภาพ Anchor หรือไม่?"):
+            settings['anchor_image'] = None
+            settings['anchor_box'] = None
+            save_settings()
+            load_anchor_template()
+            card_anchor_label.config(text=describe_anchor())
+        return
+
+    file_name = os.path.basename(file_path)
+    destination_path = os.path.join(IMAGE_FOLDER, file_name)
+    try:
+        if os.path.abspath(file_path) != os.path.abspath(destination_path):
+            shutil.copy(file_path, destination_path)
+    except OSError as e:
+        messagebox.showerror("ข้อผิดพลาด", f"ไม่สามารถคัดลอกไฟล์ได้: {e}")
+        return
+
+    settings['anchor_image'] = file_name
+    settings['anchor_box'] = None
+    load_anchor_template()
+    if anchor_template is None:
+        settings['anchor_image'] = None
+        messagebox.showerror("ข้อผิดพลาด", f"ไม่สามารถอ่านไฟล์รูปภาพ '{file_name}'")
+        return
+
+    # Learn the ROI from the current screen when the anchor is visible on it
+    frame = capture_frame()
+    height, width = frame['gray'].shape[:2]
+    score, location = match_anchor(frame, (0, 0, width, height))
+    close_capture_session()
+    if score >= ANCHOR_THRESHOLD:
+        template_height, template_width = anchor_template.shape[:2]
+        x, y, w, h = pad_box((location[0], location[1], template_width, template_height), ANCHOR_ROI_PADDING)
+        settings['anchor_box'] = [x + frame['offset'][0], y + frame['offset'][1], w, h]
+    else:
+        messagebox.showinfo("Anchor", "ไม่พบภาพ Anchor บนหน้าจอตอนนี้ จะค้นหาทั้งหน้าจอแทน\n(เปิดหน้าผลลัพธ์แล้วเลือกใหม่เพื่อกำหนดพื้นที่)")
+    save_settings()
+    card_anchor_label.config(text=describe_anchor())
+
+def on_matcher_selected(event=None):
+    """Stores the matcher backend chosen in the combobox."""
+    settings['matcher'] = list(MATCHER_BACKENDS)[card_matcher_combobox.current()]
+    save_settings()
+
+def on_geometry_selected(event=None):
+    """Stores the geometry verification model chosen in the combobox."""
+    settings['geometry'] = list(GEOMETRY_MODELS)[card_geometry_combobox.current()]
+    save_settings()
+
+def on_coarse_factor_selected(event=None):
+    """Stores the coarse search resolution chosen in the combobox."""
+    settings['coarse_factor'] = list(COARSE_FACTORS)[card_coarse_combobox.current()]
+    save_settings()
+
+def on_stable_frames_changed(*args):
+    """Stores the number of calm frames required before cards are matched."""
+    try:
+        settings['stable_frames'] = max(0, int(card_stable_frames_var.get()))
+    except ValueError:
+        return
+    save_settings()
+
+def on_detector_threads_changed(*args):
+    """Stores the number of detection threads (used from the next start)."""
+    try:
+        settings['detector_threads'] = max(0, int(card_detector_threads_var.get()))
+    except ValueError:
+        return
+    save_settings()
+
+def on_feature_tiles_changed(*args):
+    """Stores the tile grid used for parallel feature extraction."""
+    try:
+        settings['feature_tiles'] = max(0, int(card_feature_tiles_var.get()))
+    except ValueError:
+        return
+    save_settings()
+
+def on_detector_process_toggled():
+    """Stores whether detection runs in a worker process (used from the next start)."""
+    settings['detector_process'] = card_detector_process_var.get()
+    save_settings()
+
+def on_capture_fps_changed(*args):
+    """Stores the capture stage frame rate (used from the next start)."""
+    try:
+        settings['capture_fps'] = max(0.1, float(card_capture_fps_var.get()))
+    except ValueError:
+        return
+    save_settings()
+
+def on_tick_budget_changed(*args):
+    """Stores the card search time budget per detection tick."""
+    try:
+        settings['tick_budget_ms'] = max(0, int(card_tick_budget_var.get()))
+    except ValueError:
+        return
+    save_settings()
+
+def run_matcher_benchmark():
+    """Measures every matcher backend in a background thread and shows the result."""
+    if card_thread is not None and card_thread.is_alive():
+        messagebox.showwarning("คำเตือน", "โปรดหยุดการค้นหาการ์ดก่อนวัดความเร็ว")
+        return
+
+    def worker():
+        try:
+            lines = benchmark_matchers()
+        except Exception as e:
+            lines = [f"วัดความเร็วล้มเหลว: {e}"]
+        finally:
+            close_capture_session()
+        print("\n".join(lines))
+        root.after(0, lambda: show_custom_notification("ความเร็วตัวจับคู่", "\n".join(lines), root))
+
+    threading.Thread(target=worker, daemon=True).start()
+
 def upload_card():
     """Opens a window to upload a new image."""
     file_path = filedialog.askopenfilename(
@@ -368,7 +2078,8 @@ def add_card_to_gui(file_name, required_count):
         'photo': None,
         'label': None,
         'entry': None,
-        'last_found_time': 0
+        'last_found_time': 0,
+        'counted_on_screen': False
     }
     if any(config['name'] == file_name for config in images_config):
         return
@@ -786,6 +2497,15 @@ def update_macro_ui_for_idle():
 # MAIN APPLICATION SETUP
 # ----------------------------------------------------------------------
 if __name__ == '__main__':
+    # Needed by the detector worker process in PyInstaller builds
+    multiprocessing.freeze_support()
+
+    # --- Load detector settings ---
+    load_settings()
+
+    # --- Notification stage of the card pipeline ---
+    threading.Thread(target=run_notification_stage, daemon=True).start()
+
     # --- Create main window ---
     root = tk.Tk()
     root.title("ตัวนับรูปภาพและมาโครอัตโนมัติ")
@@ -874,6 +2594,91 @@ if __name__ == '__main__':
     card_mute_button.pack(side=tk.LEFT, padx=5, pady=5, expand=True)
     card_accuracy_button = ttk.Button(card_controls_frame, text="ปิดเปอร์เซ็นต์", command=toggle_accuracy_display, style="Accent.TButton")
     card_accuracy_button.pack(side=tk.LEFT, padx=5, pady=5, expand=True)
+
+    # Capture region controls
+    card_region_frame = ttk.Frame(card_tab, padding="10")
+    card_region_frame.pack(fill=tk.X, side=tk.BOTTOM)
+
+    card_region_label = ttk.Label(card_region_frame, text=describe_capture_region(), font=thai_font)
+    card_region_label.pack(side=tk.LEFT, padx=5)
+    card_region_button = ttk.Button(card_region_frame, text="ลากเลือกพื้นที่", command=select_capture_region, style="Accent.TButton")
+    card_region_button.pack(side=tk.RIGHT, padx=5)
+    card_anchor_button = ttk.Button(card_region_frame, text="ตั้งภาพ Anchor", command=select_anchor_image, style="Accent.TButton")
+    card_anchor_button.pack(side=tk.RIGHT, padx=5)
+    card_anchor_label = ttk.Label(card_region_frame, text=describe_anchor(), font=thai_font)
+    card_anchor_label.pack(side=tk.RIGHT, padx=5)
+    card_monitor_combobox = ttk.Combobox(card_region_frame, values=list_capture_monitors(), state="readonly", font=thai_font, width=25)
+    card_monitor_combobox.set("กำหนดเอง" if settings['capture_region'] else "ทั้งหน้าจอ (ทุกจอ)")
+    card_monitor_combobox.bind("<<ComboboxSelected>>", on_capture_monitor_selected)
+    card_monitor_combobox.pack(side=tk.RIGHT, padx=5)
+
+    # Matcher backend controls
+    card_matcher_frame = ttk.Frame(card_tab, padding="10")
+    card_matcher_frame.pack(fill=tk.X, side=tk.BOTTOM)
+
+    ttk.Label(card_matcher_frame, text="ตัวจับคู่:", font=thai_font).pack(side=tk.LEFT, padx=5)
+    card_matcher_combobox = ttk.Combobox(card_matcher_frame, values=list(MATCHER_BACKENDS.values()), state="readonly", font=thai_font, width=25)
+    card_matcher_combobox.set(MATCHER_BACKENDS.get(settings['matcher'], MATCHER_BACKENDS['bf']))
+    card_matcher_combobox.bind("<<ComboboxSelected>>", on_matcher_selected)
+    card_matcher_combobox.pack(side=tk.LEFT, padx=5)
+    card_benchmark_button = ttk.Button(card_matcher_frame, text="วัดความเร็ว", command=run_matcher_benchmark, style="Accent.TButton")
+    card_benchmark_button.pack(side=tk.LEFT, padx=5)
+
+    ttk.Label(card_matcher_frame, text="เฟรมนิ่งก่อนตรวจ:", font=thai_font).pack(side=tk.LEFT, padx=(20, 5))
+    card_stable_frames_var = tk.StringVar(value=str(settings['stable_frames']))
+    card_stable_frames_spinbox = ttk.Spinbox(card_matcher_frame, from_=0, to=10, width=5, textvariable=card_stable_frames_var, font=thai_font, justify="center")
+    card_stable_frames_spinbox.pack(side=tk.LEFT, padx=5)
+    card_stable_frames_var.trace_add("write", on_stable_frames_changed)
+
+    ttk.Label(card_matcher_frame, text="ค้นหาหยาบที่:", font=thai_font).pack(side=tk.LEFT, padx=(20, 5))
+    card_coarse_combobox = ttk.Combobox(card_matcher_frame, values=list(COARSE_FACTORS.values()), state="readonly", font=thai_font, width=6)
+    card_coarse_combobox.set(COARSE_FACTORS.get(settings['coarse_factor'], COARSE_FACTORS[1]))
+    card_coarse_combobox.bind("<<ComboboxSelected>>", on_coarse_factor_selected)
+    card_coarse_combobox.pack(side=tk.LEFT, padx=5)
+
+    ttk.Label(card_matcher_frame, text="ตรวจรูปทรง:", font=thai_font).pack(side=tk.LEFT, padx=(20, 5))
+    card_geometry_combobox = ttk.Combobox(card_matcher_frame, values=list(GEOMETRY_MODELS.values()), state="readonly", font=thai_font, width=20)
+    card_geometry_combobox.set(GEOMETRY_MODELS.get(settings['geometry'], GEOMETRY_MODELS['similarity']))
+    card_geometry_combobox.bind("<<ComboboxSelected>>", on_geometry_selected)
+    card_geometry_combobox.pack(side=tk.LEFT, padx=5)
+
+    # Parallel detection controls
+    card_parallel_frame = ttk.Frame(card_tab, padding="10")
+    card_parallel_frame.pack(fill=tk.X, side=tk.BOTTOM)
+
+    # Pipeline stage statistics (see report_pipeline_stats)
+    card_stats_frame = ttk.Frame(card_tab, padding=(10, 0))
+    card_stats_frame.pack(fill=tk.X, side=tk.BOTTOM)
+    card_stats_label = ttk.Label(card_stats_frame, text="", font=thai_font, style="Default.TLabel")
+    card_stats_label.pack(side=tk.LEFT, padx=5)
+
+    ttk.Label(card_parallel_frame, text="เธรดตรวจจับ (0 = ปิด):", font=thai_font).pack(side=tk.LEFT, padx=5)
+    card_detector_threads_var = tk.StringVar(value=str(settings['detector_threads']))
+    card_detector_threads_spinbox = ttk.Spinbox(card_parallel_frame, from_=0, to=os.cpu_count() or 8, width=5, textvariable=card_detector_threads_var, font=thai_font, justify="center")
+    card_detector_threads_spinbox.pack(side=tk.LEFT, padx=5)
+    card_detector_threads_var.trace_add("write", on_detector_threads_changed)
+
+    ttk.Label(card_parallel_frame, text="แบ่งภาพ ORB (ช่องต่อด้าน, 0 = ปิด):", font=thai_font).pack(side=tk.LEFT, padx=(20, 5))
+    card_feature_tiles_var = tk.StringVar(value=str(settings['feature_tiles']))
+    card_feature_tiles_spinbox = ttk.Spinbox(card_parallel_frame, from_=0, to=6, width=5, textvariable=card_feature_tiles_var, font=thai_font, justify="center")
+    card_feature_tiles_spinbox.pack(side=tk.LEFT, padx=5)
+    card_feature_tiles_var.trace_add("write", on_feature_tiles_changed)
+
+    card_detector_process_var = tk.BooleanVar(value=settings['detector_process'])
+    card_detector_process_check = ttk.Checkbutton(card_parallel_frame, text="แยกโปรเซสตรวจจับ", variable=card_detector_process_var, command=on_detector_process_toggled)
+    card_detector_process_check.pack(side=tk.LEFT, padx=(20, 5))
+
+    ttk.Label(card_parallel_frame, text="FPS จับภาพ:", font=thai_font).pack(side=tk.LEFT, padx=(20, 5))
+    card_capture_fps_var = tk.StringVar(value=str(settings['capture_fps']))
+    card_capture_fps_spinbox = ttk.Spinbox(card_parallel_frame, from_=0.5, to=30, increment=0.5, width=5, textvariable=card_capture_fps_var, font=thai_font, justify="center")
+    card_capture_fps_spinbox.pack(side=tk.LEFT, padx=5)
+    card_capture_fps_var.trace_add("write", on_capture_fps_changed)
+
+    ttk.Label(card_parallel_frame, text="เวลาต่อรอบ (ms, 0 = ไม่จำกัด):", font=thai_font).pack(side=tk.LEFT, padx=(20, 5))
+    card_tick_budget_var = tk.StringVar(value=str(settings['tick_budget_ms']))
+    card_tick_budget_spinbox = ttk.Spinbox(card_parallel_frame, from_=0, to=5000, increment=50, width=6, textvariable=card_tick_budget_var, font=thai_font, justify="center")
+    card_tick_budget_spinbox.pack(side=tk.LEFT, padx=5)
+    card_tick_budget_var.trace_add("write", on_tick_budget_changed)
     
     # Load images and create initial GUI
     if not os.path.exists(IMAGE_FOLDER):
@@ -890,7 +2695,8 @@ if __name__ == '__main__':
                     'photo': None, 
                     'label': None, 
                     'entry': None,
-                    'last_found_time': 0
+                    'last_found_time': 0,
+                    'counted_on_screen': False
                 })
     except FileNotFoundError:
         pass
@@ -65,6 +65,8 @@ reset_image_name = 'restart.png'
 # [การปรับปรุง] ปรับค่า MIN_MATCH_COUNT และ nfeatures ตามโค้ดที่คุณส่งมา
 MIN_MATCH_COUNT = 10 
 orb = cv2.ORB_create(nfeatures=5000, scoreType=cv2.ORB_FAST_SCORE) 
+# [การปรับปรุง] ใช้ลูปการปรับขนาดตามโค้ดที่คุณส่งมา
+TEMPLATE_SCALES = np.linspace(1.0, 0.2, 5)
 
 templates = {}
 reset_template = None
@@ -76,6 +78,31 @@ def save_config():
         for img_config in images_config:
             f.write(f"{img_config['name']},{img_config['required']}\n")
 
+def build_template_pyramid(template_img):
+    """
+    คำนวณ Keypoints และ Descriptors ของภาพต้นแบบล่วงหน้าในทุกขนาดของ TEMPLATE_SCALES
+    ขนาดที่เล็กกว่า 20 px หรือมี Descriptors น้อยเกินไปจะถูกตัดทิ้งตั้งแต่ตอนนี้
+    ลูปตรวจจับจึงจับคู่กับ Descriptors ที่เก็บไว้นี้เท่านั้น
+    คืนค่าเป็น dict: {'shape': (สูง, กว้าง), 'levels': [{'scale', 'pts', 'des'}, ...]}
+    """
+    levels = []
+    for scale in TEMPLATE_SCALES:
+        # ข้ามการปรับขนาดที่เล็กเกินไป
+        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
+            continue
+
+        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        kp, des = orb.detectAndCompute(scaled_template, None)
+        if des is None or len(des) < MIN_MATCH_COUNT:
+            continue
+
+        levels.append({
+            'scale': float(scale),
+            'pts': np.float32([k.pt for k in kp]),
+            'des': des
+        })
+    return {'shape': template_img.shape[:2], 'levels': levels}
+
 def load_templates():
     """โหลดและเตรียมภาพต้นแบบทั้งหมด"""
     global templates, reset_template
@@ -86,7 +113,7 @@ def load_templates():
         if os.path.exists(full_path):
             template_img = cv2.imread(full_path, cv2.IMREAD_GRAYSCALE)
             if template_img is not None:
-                templates[img_config['name']] = template_img
+                templates[img_config['name']] = build_template_pyramid(template_img)
             else:
                 print(f"ข้อผิดพลาด: ไม่สามารถอ่านไฟล์รูปภาพ '{full_path}'")
         else:
@@ -94,38 +121,79 @@ def load_templates():
 
     reset_path = os.path.join(IMAGE_FOLDER, reset_image_name)
     if os.path.exists(reset_path):
-        reset_template = cv2.imread(reset_path, cv2.IMREAD_GRAYSCALE)
+        reset_img = cv2.imread(reset_path, cv2.IMREAD_GRAYSCALE)
+        reset_template = build_template_pyramid(reset_img) if reset_img is not None else None
     else:
         messagebox.showerror("ข้อผิดพลาด", f"ไม่พบไฟล์รูปภาพ '{reset_image_name}'")
 
 # --- ฟังก์ชันการทำงานหลัก (ปรับปรุงแล้ว) ---
-def count_image_on_screen_orb(template_img):
+capture_local = threading.local()  # mss session และบัฟเฟอร์ภาพขาวดำ แยกตาม Thread
+
+def get_capture_session():
+    """คืนค่า mss session ที่ใช้ต่อเนื่องของ Thread นี้ (สร้างเมื่อเรียกใช้ครั้งแรก)"""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is None:
+        sct = mss.mss()
+        capture_local.sct = sct
+    return sct
+
+def close_capture_session():
+    """ปิด mss session ของ Thread นี้เมื่อลูปจับภาพทำงานเสร็จ"""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is not None:
+        sct.close()
+        capture_local.sct = None
+        capture_local.gray = None
+
+def grab_screen_gray():
     """
-    จับภาพหน้าจอและนับจำนวนครั้งที่พบภาพต้นแบบด้วย ORB และ Homography
-    คืนค่าเป็น tuple: (จำนวนที่พบ, ความแม่นยำเป็นเปอร์เซ็นต์)
+    จับภาพหน้าจอทั้งหมดและคืนค่าเป็นภาพขาวดำ (grayscale)
+    ใช้ข้อมูล BGRA ดิบโดยไม่คัดลอก และแปลงสีลงบัฟเฟอร์ที่จองไว้ครั้งเดียวต่อ Thread
+    ภาพที่คืนค่าจึงใช้ได้จนกว่าจะเรียกฟังก์ชันนี้ครั้งถัดไปใน Thread เดียวกัน
+    เวอร์ชันเบต้านี้จับภาพทั้ง virtual desktop (monitors[0]) เสมอ
+    การตั้งค่าพื้นที่จับภาพมีเฉพาะใน UsumeTrackSaveFinal1.0V
     """
-    sct = mss.mss()
+    sct = get_capture_session()
     screen_shot = sct.grab(sct.monitors[0])
-    screen_np = np.array(screen_shot)
-    screen_gray = cv2.cvtColor(screen_np, cv2.COLOR_BGRA2GRAY)
+    bgra = np.frombuffer(screen_shot.raw, dtype=np.uint8).reshape(screen_shot.height, screen_shot.width, 4)
+    gray = getattr(capture_local, 'gray', None)
+    if gray is None or gray.shape != bgra.shape[:2]:
+        gray = np.empty(bgra.shape[:2], dtype=np.uint8)
+        capture_local.gray = gray
+    cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=gray)
+    return gray
+
+def capture_frame():
+    """
+    จับภาพหน้าจอหนึ่งเฟรมสำหรับการตรวจหนึ่งรอบ
+    Keypoints/Descriptors ของเฟรมจะคำนวณเมื่อใช้ครั้งแรก แล้วใช้ร่วมกันทุกขนาดและทุกภาพต้นแบบ
+    """
+    return {'gray': grab_screen_gray(), 'kp': None, 'des': None}
+
+def get_frame_features(frame):
+    """คืนค่า (keypoints, descriptors) ของเฟรม โดยคำนวณเพียงครั้งเดียวต่อเฟรม"""
+    if frame['kp'] is None:
+        frame['kp'], frame['des'] = orb.detectAndCompute(frame['gray'], None)
+    return frame['kp'], frame['des']
+
+def count_image_on_screen_orb(template, frame=None):
+    """
+    นับจำนวนครั้งที่พบภาพต้นแบบ (จาก build_template_pyramid) บนหน้าจอด้วย ORB และ Homography
+    ถ้าส่ง frame (จาก capture_frame) มาจะใช้เฟรมนั้น ถ้าไม่ส่งจะจับภาพหน้าจอใหม่
+    คืนค่าเป็น tuple: (จำนวนที่พบ, ความแม่นยำเป็นเปอร์เซ็นต์)
+    """
+    if frame is None:
+        frame = capture_frame()
+    kp2, des2 = get_frame_features(frame)
+    if des2 is None or len(des2) < MIN_MATCH_COUNT:
+        return 0, 0
 
     found_count = 0
     best_accuracy = 0
 
-    # [การปรับปรุง] ใช้ลูปการปรับขนาดตามโค้ดที่คุณส่งมา
-    for scale in np.linspace(1.0, 0.2, 5): 
-        # ข้ามการปรับขนาดที่เล็กเกินไป
-        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
-            continue
-            
-        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
-        
-        kp1, des1 = orb.detectAndCompute(scaled_template, None)
-        kp2, des2 = orb.detectAndCompute(screen_gray, None)
-        
-        if des1 is None or des2 is None or len(des1) < MIN_MATCH_COUNT or len(des2) < MIN_MATCH_COUNT:
-            continue
-            
+    for level in template['levels']:
+        pts1, des1 = level['pts'], level['des']
+
         bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
         matches = bf.match(des1, des2)
         matches = sorted(matches, key=lambda x: x.distance)
@@ -133,7 +201,7 @@ def count_image_on_screen_orb(template_img):
         good_matches = matches[:50]
         
         if len(good_matches) >= MIN_MATCH_COUNT:
-            src_pts = np.float32([ kp1[m.queryIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
+            src_pts = pts1[[m.queryIdx for m in good_matches]].reshape(-1, 1, 2)
             dst_pts = np.float32([ kp2[m.trainIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
             
             M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
@@ -174,8 +242,11 @@ def play_sound_and_notify(card_name, accuracy_percent):
 def run_main_loop():
     """ฟังก์ชันหลักที่ทำงานใน Background Thread"""
     while not stop_event.is_set():
+        # จับภาพหน้าจอครั้งเดียวต่อรอบ แล้วใช้ภาพเดียวกันตรวจทั้งปุ่มรีเซ็ตและการ์ดทุกใบ
+        frame = capture_frame()
+
         if reset_template is not None:
-            current_reset_found, _ = count_image_on_screen_orb(reset_template)
+            current_reset_found, _ = count_image_on_screen_orb(reset_template, frame)
             if current_reset_found > 0:
                 root.after(0, lambda: status_label.config(text=f"รีเซ็ต!", style="Error.TLabel"))
                 for img_config in images_config:
@@ -193,10 +264,10 @@ def run_main_loop():
                 img_config['required'] = 0
 
             if img_config['found'] < img_config['required']:
-                template_img = templates.get(img_config['name'])
-                if template_img is not None:
+                template = templates.get(img_config['name'])
+                if template is not None:
                     # รับค่าความแม่นยำกลับมาด้วย
-                    current_found, accuracy = count_image_on_screen_orb(template_img)
+                    current_found, accuracy = count_image_on_screen_orb(template, frame)
                     
                     # --- แก้ไขส่วนนี้เพื่อป้องกันการนับซ้ำ ---
                     if current_found > 0:
@@ -225,6 +296,7 @@ def run_main_loop():
         
         time.sleep(0.5)
     
+    close_capture_session()
     root.after(100, update_gui)
     root.after(100, update_status_after_stop)
 
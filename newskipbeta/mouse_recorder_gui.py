@@ -142,15 +142,48 @@ def load_templates():
         # ไม่จำเป็นต้องมีไฟล์นี้ แต่จะแสดงข้อผิดพลาดถ้าไม่มี
         pass
 
+capture_local = threading.local()  # mss session และบัฟเฟอร์ภาพขาวดำ แยกตาม Thread
+
+def get_capture_session():
+    """คืนค่า mss session ที่ใช้ต่อเนื่องของ Thread นี้ (สร้างเมื่อเรียกใช้ครั้งแรก)"""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is None:
+        sct = mss.mss()
+        capture_local.sct = sct
+    return sct
+
+def close_capture_session():
+    """ปิด mss session ของ Thread นี้เมื่อลูปจับภาพทำงานเสร็จ"""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is not None:
+        sct.close()
+        capture_local.sct = None
+        capture_local.gray = None
+
+def grab_screen_gray():
+    """
+    จับภาพหน้าจอทั้งหมดและคืนค่าเป็นภาพขาวดำ (grayscale)
+    ใช้ข้อมูล BGRA ดิบโดยไม่คัดลอก และแปลงสีลงบัฟเฟอร์ที่จองไว้ครั้งเดียวต่อ Thread
+    ภาพที่คืนค่าจึงใช้ได้จนกว่าจะเรียกฟังก์ชันนี้ครั้งถัดไปใน Thread เดียวกัน
+    เวอร์ชันเบต้านี้จับภาพทั้ง virtual desktop (monitors[0]) เสมอ
+    การตั้งค่าพื้นที่จับภาพมีเฉพาะใน UsumeTrackSaveFinal1.0V
+    """
+    sct = get_capture_session()
+    screen_shot = sct.grab(sct.monitors[0])
+    bgra = np.frombuffer(screen_shot.raw, dtype=np.uint8).reshape(screen_shot.height, screen_shot.width, 4)
+    gray = getattr(capture_local, 'gray', None)
+    if gray is None or gray.shape != bgra.shape[:2]:
+        gray = np.empty(bgra.shape[:2], dtype=np.uint8)
+        capture_local.gray = gray
+    cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=gray)
+    return gray
+
 def find_image_on_screen_robust(template_keypoints, template_descriptors):
     """
     ใช้ ORB feature matching เพื่อหาภาพต้นแบบบนหน้าจออย่างแม่นยำ
     โดยใช้เทคนิค findHomography และ RANSAC เพื่อกรองผลลัพธ์
     """
-    sct = mss.mss()
-    screen_shot = sct.grab(sct.monitors[0])
-    screen_np = np.array(screen_shot)
-    screen_gray = cv2.cvtColor(screen_np, cv2.COLOR_BGRA2GRAY)
+    screen_gray = grab_screen_gray()
 
     # คำนวณ Keypoints และ Descriptors ของหน้าจอ
     screen_keypoints, screen_descriptors = orb.detectAndCompute(screen_gray, None)
@@ -188,7 +221,7 @@ def run_umasu_main_loop():
     while not umasu_stop_event.is_set():
         if reset_template is not None:
             # ใช้ Template Matching แบบธรรมดาสำหรับปุ่มรีเซ็ต (ซึ่งไม่ควรมีการเปลี่ยนแปลง)
-            res = cv2.matchTemplate(cv2.cvtColor(np.array(mss.mss().grab(mss.mss().monitors[0])), cv2.COLOR_BGRA2GRAY), reset_template, cv2.TM_CCOEFF_NORMED)
+            res = cv2.matchTemplate(grab_screen_gray(), reset_template, cv2.TM_CCOEFF_NORMED)
             _, max_val, _, _ = cv2.minMaxLoc(res)
             if max_val > 0.8: # ใช้เกณฑ์ความแม่นยำสูงสำหรับปุ่มรีเซ็ต
                 root.after(0, lambda: umasu_status_label.config(text="สถานะ: กำลังรีเซ็ต...", style="Warning.TLabel"))
@@ -231,6 +264,7 @@ def run_umasu_main_loop():
         
         time.sleep(0.5)
     
+    close_capture_session()
     root.after(100, update_umasu_gui)
     root.after(100, update_umasu_status_after_stop)
 
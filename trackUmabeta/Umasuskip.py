@@ -11,6 +11,7 @@ import threading
 import os
 import sys
 import shutil
+import json
 
 # ต้องติดตั้งไลบรารี playsound เพื่อให้การแจ้งเตือนด้วยเสียงทำงาน
 # สามารถติดตั้งได้โดยใช้คำสั่ง: pip install playsound
@@ -28,6 +29,18 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def data_path(relative_path):
+    """
+    คืนค่าเส้นทางของไฟล์ที่โปรแกรมเขียนและต้องเก็บไว้ใช้ครั้งถัดไป
+    ไฟล์ .exe แบบ onefile จะแตกไฟล์ไว้ในโฟลเดอร์ชั่วคราวที่ถูกลบเมื่อปิดโปรแกรม
+    จึงเก็บไฟล์เหล่านี้ไว้ข้างไฟล์ .exe แทน
+    """
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
 # -----------------------------------------------
 
 # --- ใช้ฟังก์ชันใหม่เพื่อกำหนดเส้นทางโฟลเดอร์รูปภาพ ---
@@ -67,6 +80,16 @@ MIN_MATCH_COUNT = 15
 # [การแก้ไข] ปรับ nfeatures เพื่อให้ตรวจจับ Feature ได้มากขึ้นและแม่นยำขึ้น
 orb = cv2.ORB_create(nfeatures=20000, scoreType=cv2.ORB_FAST_SCORE) 
 
+# [การแก้ไข] ปรับจำนวนขั้นให้ละเอียดขึ้นเพื่อเพิ่มโอกาสในการตรวจจับภาพเล็ก
+# [การแก้ไข] เพิ่มจำนวนขั้นการปรับขนาดเป็น 40 เพื่อให้ค้นหาขนาดเล็กได้แม่นยำขึ้น
+TEMPLATE_SCALES = np.linspace(1.0, 0.1, 40)
+# จำนวนขนาดที่ตรวจ Homography รอบขนาดที่ประมาณจากขนาด Keypoint (แทนการไล่ตรวจทั้ง 40 ขนาด)
+SCALE_INFERENCE_LEVELS = 2
+# ไฟล์เก็บช่วงขนาดที่ปรับเทียบแล้ว แยกตามความละเอียดหน้าจอ: {"กว้างxสูง": {ชื่อไฟล์: [ขนาดต่ำสุด, ขนาดสูงสุด]}}
+CALIBRATION_FILE = data_path("calibration.json")
+CALIBRATION_BAND = 0.10  # ค้นหาเฉพาะช่วง ±10% รอบขนาดที่วัดได้
+calibration = {}
+
 templates = {}
 reset_template = None
 
@@ -77,6 +100,85 @@ def save_config():
         for img_config in images_config:
             f.write(f"{img_config['name']},{img_config['required']}\n")
 
+def load_calibration():
+    """โหลดช่วงขนาดที่ปรับเทียบไว้จาก calibration.json (ถ้าไม่มีไฟล์จะค้นหาทุกขนาดตามปกติ)"""
+    try:
+        with open(CALIBRATION_FILE, "r", encoding="utf-8") as f:
+            calibration.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"ข้อผิดพลาด: ไม่สามารถอ่านไฟล์ปรับเทียบ: {e}")
+
+def save_calibration():
+    """บันทึกช่วงขนาดที่ปรับเทียบแล้วลงใน calibration.json"""
+    with open(CALIBRATION_FILE, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, ensure_ascii=False, indent=2)
+
+def screen_profile(frame):
+    """คืนค่าชื่อโปรไฟล์ความละเอียดของเฟรม เช่น '1920x1080'"""
+    height, width = frame['gray'].shape[:2]
+    return f"{width}x{height}"
+
+def get_scale_band(frame, name):
+    """คืนค่าช่วงขนาด (ต่ำสุด, สูงสุด) ที่ปรับเทียบไว้ของภาพต้นแบบบนความละเอียดนี้ หรือ None ถ้ายังไม่ได้ปรับเทียบ"""
+    band = calibration.get(screen_profile(frame), {}).get(name)
+    return tuple(band) if band else None
+
+def select_template_rows(template, band):
+    """
+    คืนค่าเฉพาะแถว Descriptors ของขนาดที่อยู่ในช่วง band (ถ้าไม่มีขนาดใดอยู่ในช่วงจะใช้ขนาดที่ใกล้ที่สุด)
+    ผลลัพธ์ถูกเก็บไว้ในภาพต้นแบบ จึงคำนวณเพียงครั้งเดียวต่อช่วงขนาด
+    ถ้า band เป็น None จะคืนค่าภาพต้นแบบทั้งชุด (ค้นหาทุกขนาด)
+    """
+    if band is None:
+        return template
+    band_rows = template.setdefault('bands', {})
+    if band not in band_rows:
+        level_scales = np.float32([level['scale'] for level in template['levels']])
+        in_band = np.flatnonzero((level_scales >= band[0]) & (level_scales <= band[1]))
+        if len(in_band) == 0:
+            in_band = [int(np.argmin(np.abs(level_scales - (band[0] + band[1]) / 2)))]
+        rows = np.flatnonzero(np.isin(template['level_ids'], in_band))
+        band_rows[band] = {key: template[key][rows] for key in ('des', 'level_ids', 'pts', 'sizes', 'scales')}
+    return band_rows[band]
+
+def build_template_pyramid(template_img):
+    """
+    คำนวณ Keypoints และ Descriptors ของภาพต้นแบบล่วงหน้าในทุกขนาดของ TEMPLATE_SCALES
+    ขนาดที่เล็กกว่า 20 px หรือมี Descriptors น้อยเกินไปจะถูกตัดทิ้งตั้งแต่ตอนนี้
+    ลูปตรวจจับจึงจับคู่กับ Descriptors ที่เก็บไว้นี้เท่านั้น
+    Descriptors ทุกขนาดถูกรวมไว้ใน 'des' เพื่อให้จับคู่ได้ในครั้งเดียว แต่ละแถวมี 'level_ids',
+    'pts', 'sizes' (ขนาด Keypoint) และ 'scales' ของแถวนั้นกำกับไว้
+    คืนค่าเป็น dict: {'shape': (สูง, กว้าง), 'levels': [{'scale', 'pts', 'des'}, ...], 'des', 'level_ids', 'pts', 'sizes', 'scales'}
+    """
+    levels = []
+    for scale in TEMPLATE_SCALES:
+        # ข้ามการปรับขนาดที่เล็กเกินไป
+        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
+            continue
+
+        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        kp, des = orb.detectAndCompute(scaled_template, None)
+        if des is None or len(des) < MIN_MATCH_COUNT:
+            continue
+
+        levels.append({
+            'scale': float(scale),
+            'pts': np.float32([k.pt for k in kp]),
+            'sizes': np.float32([k.size for k in kp]),
+            'des': des
+        })
+
+    template = {'shape': template_img.shape[:2], 'levels': levels}
+    if levels:
+        template['des'] = np.concatenate([level['des'] for level in levels])
+        template['level_ids'] = np.concatenate([np.full(len(level['des']), i) for i, level in enumerate(levels)])
+        template['pts'] = np.concatenate([level['pts'] for level in levels])
+        template['sizes'] = np.concatenate([level['sizes'] for level in levels])
+        template['scales'] = np.concatenate([np.full(len(level['des']), level['scale'], dtype=np.float32) for level in levels])
+    return template
+
 def load_templates():
     """โหลดและเตรียมภาพต้นแบบทั้งหมด"""
     global templates, reset_template
@@ -87,7 +189,7 @@ def load_templates():
         if os.path.exists(full_path):
             template_img = cv2.imread(full_path, cv2.IMREAD_GRAYSCALE)
             if template_img is not None:
-                templates[img_config['name']] = template_img
+                templates[img_config['name']] = build_template_pyramid(template_img)
             else:
                 print(f"ข้อผิดพลาด: ไม่สามารถอ่านไฟล์รูปภาพ '{full_path}'")
         else:
@@ -95,67 +197,175 @@ def load_templates():
 
     reset_path = os.path.join(IMAGE_FOLDER, reset_image_name)
     if os.path.exists(reset_path):
-        reset_template = cv2.imread(reset_path, cv2.IMREAD_GRAYSCALE)
+        reset_img = cv2.imread(reset_path, cv2.IMREAD_GRAYSCALE)
+        reset_template = build_template_pyramid(reset_img) if reset_img is not None else None
     else:
         messagebox.showerror("ข้อผิดพลาด", f"ไม่พบไฟล์รูปภาพ '{reset_image_name}'")
 
 # --- ฟังก์ชันการทำงานหลัก (ปรับปรุงแล้ว) ---
-def count_image_on_screen_orb(template_img):
+capture_local = threading.local()  # mss session และบัฟเฟอร์ภาพขาวดำ แยกตาม Thread
+
+def get_capture_session():
+    """คืนค่า mss session ที่ใช้ต่อเนื่องของ Thread นี้ (สร้างเมื่อเรียกใช้ครั้งแรก)"""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is None:
+        sct = mss.mss()
+        capture_local.sct = sct
+    return sct
+
+def close_capture_session():
+    """ปิด mss session ของ Thread นี้เมื่อลูปจับภาพทำงานเสร็จ"""
+    sct = getattr(capture_local, 'sct', None)
+    if sct is not None:
+        sct.close()
+        capture_local.sct = None
+        capture_local.gray = None
+
+def grab_screen_gray():
     """
-    จับภาพหน้าจอและนับจำนวนครั้งที่พบภาพต้นแบบด้วย ORB และ Homography
-    คืนค่าเป็น tuple: (จำนวนที่พบ, ความแม่นยำเป็นเปอร์เซ็นต์)
+    จับภาพหน้าจอทั้งหมดและคืนค่าเป็นภาพขาวดำ (grayscale)
+    ใช้ข้อมูล BGRA ดิบโดยไม่คัดลอก และแปลงสีลงบัฟเฟอร์ที่จองไว้ครั้งเดียวต่อ Thread
+    ภาพที่คืนค่าจึงใช้ได้จนกว่าจะเรียกฟังก์ชันนี้ครั้งถัดไปใน Thread เดียวกัน
+    เวอร์ชันเบต้านี้จับภาพทั้ง virtual desktop (monitors[0]) เสมอ
+    การตั้งค่าพื้นที่จับภาพมีเฉพาะใน UsumeTrackSaveFinal1.0V
     """
-    sct = mss.mss()
+    sct = get_capture_session()
     screen_shot = sct.grab(sct.monitors[0])
-    screen_np = np.array(screen_shot)
-    screen_gray = cv2.cvtColor(screen_np, cv2.COLOR_BGRA2GRAY)
+    bgra = np.frombuffer(screen_shot.raw, dtype=np.uint8).reshape(screen_shot.height, screen_shot.width, 4)
+    gray = getattr(capture_local, 'gray', None)
+    if gray is None or gray.shape != bgra.shape[:2]:
+        gray = np.empty(bgra.shape[:2], dtype=np.uint8)
+        capture_local.gray = gray
+    cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=gray)
+    return gray
+
+def capture_frame():
+    """
+    จับภาพหน้าจอหนึ่งเฟรมสำหรับการตรวจหนึ่งรอบ
+    Keypoints/Descriptors ของเฟรมจะคำนวณเมื่อใช้ครั้งแรก แล้วใช้ร่วมกันทุกขนาดและทุกภาพต้นแบบ
+    """
+    return {'gray': grab_screen_gray(), 'pts': None, 'sizes': None, 'des': None}
+
+def get_frame_features(frame):
+    """
+    คืนค่า (พิกัด Keypoints, ขนาด Keypoints, descriptors) ของเฟรมเป็น NumPy array
+    โดยคำนวณเพียงครั้งเดียวต่อเฟรม
+    """
+    if frame['pts'] is None:
+        kp, frame['des'] = orb.detectAndCompute(frame['gray'], None)
+        if not kp:
+            # หน้าจอสีเรียบ (เช่น หน้าโหลดสีดำ) ไม่มี Keypoints เลย
+            frame['pts'], frame['sizes'], frame['des'] = np.zeros((0, 2), np.float32), np.zeros(0, np.float32), None
+        else:
+            frame['pts'] = cv2.KeyPoint_convert(kp).reshape(-1, 2)
+            frame['sizes'] = np.fromiter((k.size for k in kp), dtype=np.float32, count=len(kp))
+    return frame['pts'], frame['sizes'], frame['des']
+
+def count_image_on_screen_orb(template, frame=None, band=None):
+    """
+    นับจำนวนครั้งที่พบภาพต้นแบบ (จาก build_template_pyramid) บนหน้าจอด้วย ORB และ Homography
+    ถ้าส่ง frame (จาก capture_frame) มาจะใช้เฟรมนั้น ถ้าไม่ส่งจะจับภาพหน้าจอใหม่
+    ถ้าส่ง band (ช่วงขนาดที่ปรับเทียบแล้ว) มาจะค้นหาเฉพาะขนาดในช่วงนั้น
+    คืนค่าเป็น tuple: (จำนวนที่พบ, ความแม่นยำเป็นเปอร์เซ็นต์)
+    """
+    found_count, best_accuracy, _ = match_template(template, frame, band)
+    return found_count, best_accuracy
+
+def match_template(template, frame=None, band=None, sweep=False):
+    """
+    ค้นหาภาพต้นแบบบนเฟรมแบบเดียวกับ count_image_on_screen_orb
+    ปกติจะตรวจ Homography เฉพาะขนาดที่ใกล้ขนาดที่ประมาณจาก Keypoint ที่สุด
+    ถ้า sweep=True จะตรวจทุกขนาด (ใช้ตอนปรับเทียบ)
+    คืนค่าเป็น tuple: (จำนวนที่พบ, ความแม่นยำเป็นเปอร์เซ็นต์, ขนาดจริงบนหน้าจอเทียบกับภาพต้นแบบ หรือ None)
+    """
+    if frame is None:
+        frame = capture_frame()
+    pts2, sizes2, des2 = get_frame_features(frame)
+    if des2 is None or len(des2) < MIN_MATCH_COUNT:
+        return 0, 0, None
+
+    if not template['levels']:
+        return 0, 0, None
+    rows = select_template_rows(template, band)
 
     found_count = 0
     best_accuracy = 0
-
-    # [การแก้ไข] ปรับจำนวนขั้นให้ละเอียดขึ้นเพื่อเพิ่มโอกาสในการตรวจจับภาพเล็ก
-    # [การแก้ไข] เพิ่มจำนวนขั้นการปรับขนาดเป็น 40 เพื่อให้ค้นหาขนาดเล็กได้แม่นยำขึ้น
-    for scale in np.linspace(1.0, 0.1, 40): 
-        # ข้ามการปรับขนาดที่เล็กเกินไป
-        if template_img.shape[0] * scale < 20 or template_img.shape[1] * scale < 20:
-            continue
-            
-        scaled_template = cv2.resize(template_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    best_scale = None
+
+    # [การแก้ไข] จับคู่กับ Descriptors ทุกขนาดพร้อมกันครั้งเดียว แทนการวนจับคู่ทีละขนาด
+    # ORB เป็น Descriptor แบบไบนารี จึงต้องวัดระยะด้วย NORM_HAMMING (ค่าเริ่มต้น NORM_L2 ผิดและช้ากว่า)
+    # batchDistance คืนค่าเพื่อนบ้านใกล้สุด 2 ตัวเป็น array โดยตรง ไม่ต้องสร้าง DMatch ทีละคู่
+    distances, train_idx = cv2.batchDistance(rows['des'], des2, cv2.CV_32S, normType=cv2.NORM_HAMMING, K=2)
+
+    # [การแก้ไข] ใช้ Ratio Test เพื่อกรองการจับคู่ที่ดีที่สุดเท่านั้น (คำนวณทั้ง array ในครั้งเดียว)
+    query_idx = np.flatnonzero((train_idx[:, 1] >= 0) & (distances[:, 0] < 0.75 * distances[:, 1]))
+    if len(query_idx) < MIN_MATCH_COUNT:
+        return 0, 0, None
+    match_train = train_idx[query_idx, 0]
+    match_distance = distances[query_idx, 0]
+
+    # ประมาณขนาดบนหน้าจอจากอัตราส่วนขนาด Keypoint ของ 50 คู่ที่ดีที่สุด
+    # แล้วตรวจ Homography เฉพาะขนาดที่ใกล้ค่าประมาณที่สุดเท่านั้น
+    best = np.argsort(match_distance, kind='stable')[:50]
+    best_query = query_idx[best]
+    screen_scale = float(np.median(rows['scales'][best_query] * sizes2[match_train[best]] / rows['sizes'][best_query]))
+
+    match_levels = rows['level_ids'][query_idx]
+    levels_found = np.unique(match_levels)
+    level_scales = np.float32([template['levels'][i]['scale'] for i in levels_found])
+    nearest_levels = levels_found[np.argsort(np.abs(np.log(level_scales / screen_scale)), kind='stable')]
+
+    levels_to_verify = nearest_levels if sweep else nearest_levels[:SCALE_INFERENCE_LEVELS]
+    for level_id in levels_to_verify:
+        in_level = match_levels == level_id
+        level_count = int(np.count_nonzero(in_level))
         
-        kp1, des1 = orb.detectAndCompute(scaled_template, None)
-        kp2, des2 = orb.detectAndCompute(screen_gray, None)
-        
-        if des1 is None or des2 is None or len(des1) < MIN_MATCH_COUNT or len(des2) < MIN_MATCH_COUNT:
-            continue
-            
-        # [การแก้ไข] เปลี่ยนไปใช้ BFMatcher แบบไม่มี crossCheck เพื่อให้สามารถใช้ Ratio Test ได้
-        bf = cv2.BFMatcher()
-        matches = bf.knnMatch(des1, des2, k=2)
-
-        # [การแก้ไข] ใช้ Ratio Test เพื่อกรองการจับคู่ที่ดีที่สุดเท่านั้น
-        good_matches = []
-        for m, n in matches:
-            if m.distance < 0.75 * n.distance:
-                good_matches.append(m)
-        
-        if len(good_matches) >= MIN_MATCH_COUNT:
-            src_pts = np.float32([ kp1[m.queryIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
-            dst_pts = np.float32([ kp2[m.trainIdx].pt for m in good_matches ]).reshape(-1, 1, 2)
+        if level_count >= MIN_MATCH_COUNT:
+            src_pts = rows['pts'][query_idx[in_level]].reshape(-1, 1, 2)
+            dst_pts = pts2[match_train[in_level]].reshape(-1, 1, 2)
             
             M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
 
             if M is not None:
-                matches_mask = mask.ravel().tolist()
-                inliers = sum(matches_mask)
+                inliers = int(np.count_nonzero(mask))
                 
                 if inliers >= MIN_MATCH_COUNT:
-                    accuracy_percent = (inliers / len(good_matches)) * 100
+                    accuracy_percent = (inliers / level_count) * 100
                     # ไม่รีเทิร์นทันที แต่เก็บค่าความแม่นยำที่ดีที่สุดไว้
                     if accuracy_percent > best_accuracy:
                         best_accuracy = accuracy_percent
                         found_count = 1 # ยืนยันว่าเจออย่างน้อยหนึ่งครั้ง
+                        # ขนาดจริง = ขนาดของชั้นนี้ x อัตราขยายของ Homography
+                        best_scale = template['levels'][level_id]['scale'] * float(np.sqrt(abs(np.linalg.det(M[:2, :2]))))
 
-    return found_count, best_accuracy
+    return found_count, best_accuracy, best_scale
+
+def calibrate_scales():
+    """
+    วัดขนาดจริงบนหน้าจอของภาพต้นแบบทุกภาพจากภาพหน้าจอปัจจุบัน (ควรเปิดหน้าผลลัพธ์ที่มีการ์ดให้เห็น)
+    โดยตรวจทุกขนาด แล้วบันทึกช่วง ±CALIBRATION_BAND ไว้ในโปรไฟล์ความละเอียดนี้
+    ภาพต้นแบบที่ไม่พบบนหน้าจอจะยังค้นหาทุกขนาดตามเดิม
+    คืนค่าเป็นรายการข้อความผลการปรับเทียบ
+    """
+    frame = capture_frame()
+    profile = screen_profile(frame)
+    named_templates = dict(templates)
+    if reset_template is not None:
+        named_templates[reset_image_name] = reset_template
+
+    bands = calibration.setdefault(profile, {})
+    lines = [f"ความละเอียด {profile}"]
+    for name, template in named_templates.items():
+        found_count, accuracy, scale = match_template(template, frame, sweep=True)
+        if found_count and scale:
+            bands[name] = [round(scale * (1 - CALIBRATION_BAND), 4), round(scale * (1 + CALIBRATION_BAND), 4)]
+            lines.append(f"{name}: ขนาด {scale:.2f} (ความแม่นยำ {accuracy:.0f}%)")
+        else:
+            # ลบช่วงขนาดเดิม (ถ้ามี) เพื่อให้กลับไปค้นหาทุกขนาดจริงตามที่แจ้ง
+            bands.pop(name, None)
+            lines.append(f"{name}: ไม่พบบนหน้าจอ (ค้นหาทุกขนาดตามเดิม)")
+    save_calibration()
+    return lines
 
 def play_sound_and_notify(card_name, accuracy_percent):
     """ฟังก์ชันสำหรับเล่นเสียงและแสดงหน้าต่างแจ้งเตือน"""
@@ -175,8 +385,11 @@ def play_sound_and_notify(card_name, accuracy_percent):
 def run_main_loop():
     """ฟังก์ชันหลักที่ทำงานใน Background Thread"""
     while not stop_event.is_set():
+        # จับภาพหน้าจอครั้งเดียวต่อรอบ แล้วใช้ภาพเดียวกันตรวจทั้งปุ่มรีเซ็ตและการ์ดทุกใบ
+        frame = capture_frame()
+
         if reset_template is not None:
-            current_reset_found, _ = count_image_on_screen_orb(reset_template)
+            current_reset_found, _ = count_image_on_screen_orb(reset_template, frame, get_scale_band(frame, reset_image_name))
             if current_reset_found > 0:
                 root.after(0, lambda: status_label.config(text=f"รีเซ็ต!", style="Error.TLabel"))
                 for img_config in images_config:
@@ -194,10 +407,10 @@ def run_main_loop():
                 img_config['required'] = 0
 
             if img_config['found'] < img_config['required']:
-                template_img = templates.get(img_config['name'])
-                if template_img is not None:
+                template = templates.get(img_config['name'])
+                if template is not None:
                     # รับค่าความแม่นยำกลับมาด้วย
-                    current_found, accuracy = count_image_on_screen_orb(template_img)
+                    current_found, accuracy = count_image_on_screen_orb(template, frame, get_scale_band(frame, img_config['name']))
                     
                     # --- แก้ไขส่วนนี้เพื่อป้องกันการนับซ้ำ ---
                     if current_found > 0:
@@ -226,6 +439,7 @@ def run_main_loop():
         
         time.sleep(0.5)
     
+    close_capture_session()
     root.after(100, update_gui)
     root.after(100, update_status_after_stop)
 
@@ -262,6 +476,23 @@ def start_program():
         start_button.config(state=tk.DISABLED)
         stop_button.config(state=tk.NORMAL)
 
+def start_calibration():
+    """ปรับเทียบขนาดใน Background Thread แล้วแสดงผลลัพธ์"""
+    if thread is not None and thread.is_alive():
+        messagebox.showwarning("คำเตือน", "กรุณาหยุดการค้นหาก่อนปรับเทียบขนาด")
+        return
+
+    def worker():
+        try:
+            lines = calibrate_scales()
+        except Exception as e:
+            lines = [f"ปรับเทียบล้มเหลว: {e}"]
+        finally:
+            close_capture_session()
+        root.after(0, lambda: messagebox.showinfo("ปรับเทียบขนาด", "\n".join(lines)))
+
+    threading.Thread(target=worker, daemon=True).start()
+
 def stop_program():
     """หยุดการทำงานของโปรแกรม"""
     stop_event.set()
@@ -454,7 +685,11 @@ stop_button.pack(side=tk.LEFT, padx=5, pady=5)
 upload_button = ttk.Button(controls_frame, text="อัปโหลดการ์ด", command=upload_card)
 upload_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+calibrate_button = ttk.Button(controls_frame, text="ปรับเทียบขนาด", command=start_calibration)
+calibrate_button.pack(side=tk.LEFT, padx=5, pady=5)
+
 # โหลดภาพและสร้าง GUI เริ่มต้น
+load_calibration()
 load_templates()
 render_images_frame()
 